@@ -1,5 +1,5 @@
 import streamlit as st
-from app.auth import authenticate_user, register_user, initialize_session_state
+from app.auth import authenticate_user, register_user, initialize_session_state, start_session, get_client_id
 
 # Initialize session
 initialize_session_state()
@@ -29,12 +29,9 @@ with tab_login:
         if not login_username or not login_password:
             st.error("❌ Please enter both username and password")
         else:
-            success, user_data, message = authenticate_user(login_username, login_password)
+            success, user_data, message = authenticate_user(login_username, login_password, get_client_id())
             if success:
-                st.session_state.logged_in = True
-                st.session_state.username = user_data['username']
-                st.session_state.role = user_data['role']  # CHANGED from "user_role" to "role"
-                st.session_state.user_id = user_data['id']
+                start_session(user_data)
                 st.success(f"✅ Welcome back, {login_username}!")
                 
                 # Add a small delay for better UX
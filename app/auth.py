@@ -1,13 +1,36 @@
 
-import bcrypt
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
 import sqlite3
 from pathlib import Path
 import streamlit as st
+from app.services.password_hashing import get_hasher, HashingOverloaded, rehash_if_needed
+from app.services.login_throttle import LoginThrottle
+from app.services.incident_buffer import sync_session_incident_buffer
+from app.data.users import update_password_hash
 
 # Database path
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
+# Per-username and per-client login rate limits (snapshotted to login_throttle)
+login_throttle = LoginThrottle(DB_PATH)
+
+# Reverse proxies in front of the app whose X-Forwarded-For entries are trusted
+TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", "0"))
+
 def logout():
+    # Write this user's pending incident edits before the session is handed on
+    flush_incident_buffer(None)
+    revoke_session_token(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.logged_in = False
     st.session_state.username = ""
     st.session_state.role = ""  # CHANGED from "user_role" to "role"
@@ -39,15 +62,15 @@ def validate_password(password):
     return True, "Password is valid"
 
 def hash_password(password):
-    """Hash password using bcrypt."""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    """Hash password using bcrypt (on the shared hashing pool)."""
+    return get_hasher().hash_password(password)
 
 def verify_password(password, hashed_password):
-    """Verify password against hash."""
+    """Verify password against hash (on the shared hashing pool)."""
     try:
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+        return get_hasher().check_password(password, hashed_password)
+    except HashingOverloaded:
+        raise
     except:
         return False
 
@@ -107,16 +130,43 @@ def register_user(username, password, role="user"):
     except Exception as e:
         return False, f"Registration failed: {str(e)}"
 
-def authenticate_user(username, password):
+def get_client_id():
+    """
+    Identifier of the browser's client (IP address) for login throttling.
+
+    X-Forwarded-For is client-controlled, so by default only the socket
+    address is used. Behind reverse proxies, set TRUSTED_PROXIES to how
+    many there are: each appends the address it received from, so the
+    client is that many entries from the right, and anything further left
+    is ignored.
+    """
+    try:
+        if TRUSTED_PROXIES > 0:
+            forwarded = [a.strip() for a in st.context.headers.get("X-Forwarded-For", "").split(",")]
+            forwarded = [a for a in forwarded if a]
+            if len(forwarded) >= TRUSTED_PROXIES:
+                return forwarded[-TRUSTED_PROXIES]
+        return getattr(st.context, "ip_address", None)
+    except Exception:
+        return None
+
+def authenticate_user(username, password, client_id=None):
     """
     Authenticate user against database.
     
+    Attempts are throttled per username and per client before any database
+    or bcrypt work is done.
+    
     Returns:
         tuple: (success: bool, user_data: dict or None, message: str)
     """
     if not username or not password:
         return False, None, "Username and password are required"
     
+    allowed, retry_after = login_throttle.allow(username, client_id)
+    if not allowed:
+        return False, None, f"Too many login attempts. Try again in {math.ceil(retry_after)} seconds."
+    
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -131,6 +181,11 @@ def authenticate_user(username, password):
             return False, None, "User not found"
         
         if verify_password(password, user_row['password_hash']):
+            login_throttle.record_success(username, client_id)
+            # Upgrade hashes made at an outdated cost, off the login path
+            stored_hash = user_row['password_hash']
+            rehash_if_needed(password, stored_hash,
+                             lambda new_hash: update_password_hash(username, new_hash, stored_hash, DB_PATH))
             user_data = {
                 'id': user_row['id'],
                 'username': user_row['username'],
@@ -139,6 +194,8 @@ def authenticate_user(username, password):
             return True, user_data, "Login successful"
         else:
             return False, None, "Incorrect password"
+    except HashingOverloaded:
+        return False, None, "Too many logins in progress. Please try again in a moment."
     except Exception as e:
         return False, None, f"Authentication error: {str(e)}"
     
@@ -155,4 +212,198 @@ def initialize_session_state():
         st.session_state.role = ""
     
     if "user_id" not in st.session_state:
-        st.session_state.user_id = None
\ No newline at end of file
+        st.session_state.user_id = None
+
+    if "session_token" not in st.session_state:
+        st.session_state.session_token = None
+
+
+# --- Session tokens -------------------------------------------------------
+#
+# A login issues an HMAC-signed token carrying the user's id, name, role and
+# expiry. Pages check it with verify_session_token, which after the first
+# check is a dictionary lookup in a per-process LRU - no bcrypt, no users
+# query. Set SESSION_SECRET to keep tokens valid across restarts and between
+# processes; otherwise each process signs with its own random key.
+
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+SESSION_TTL_SECONDS = 8 * 60 * 60
+VERIFIED_TOKEN_CACHE_SIZE = 1024
+
+_session_lock = threading.Lock()
+_verified_tokens = OrderedDict()   # token -> claims
+_revoked_sessions = {}             # session id -> expiry
+_user_generations = {}             # username -> generation, bumped on role change
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload):
+    return _b64encode(hmac.new(SESSION_SECRET, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def _is_current(claims, now):
+    """Not expired, not revoked, and issued for the user's current role."""
+    return (
+        claims["exp"] > now
+        and claims["sid"] not in _revoked_sessions
+        and claims["gen"] == _user_generations.get(claims["username"], 0)
+    )
+
+
+def issue_session_token(user_data, ttl=SESSION_TTL_SECONDS):
+    """
+    Create a signed session token for an authenticated user.
+
+    Args:
+        user_data: Dict with id, username and role (as from authenticate_user)
+        ttl: Lifetime in seconds
+
+    Returns:
+        str: Token to keep in st.session_state.session_token
+    """
+    now = int(time.time())
+    with _session_lock:
+        generation = _user_generations.get(user_data['username'], 0)
+    claims = {
+        "id": user_data['id'],
+        "username": user_data['username'],
+        "role": user_data['role'],
+        "gen": generation,
+        "sid": secrets.token_urlsafe(12),
+        "iat": now,
+        "exp": now + ttl,
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_session_token(token):
+    """
+    Check a session token.
+
+    Returns:
+        dict or None: The token's claims (id, username, role, exp, ...)
+            if it is valid, None otherwise
+    """
+    if not token:
+        return None
+    now = time.time()
+    with _session_lock:
+        claims = _verified_tokens.get(token)
+        if claims is not None:
+            if _is_current(claims, now):
+                _verified_tokens.move_to_end(token)
+                return claims
+            del _verified_tokens[token]
+            return None
+
+    # First sight of this token in this process: check the signature
+    try:
+        payload, signature = token.split(".", 1)
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+
+    with _session_lock:
+        if not _is_current(claims, now):
+            return None
+        _verified_tokens[token] = claims
+        while len(_verified_tokens) > VERIFIED_TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return claims
+
+
+def revoke_session_token(token):
+    """Invalidate one session (e.g. on logout). Unknown tokens are ignored."""
+    claims = verify_session_token(token)
+    if claims is None:
+        return
+    now = time.time()
+    with _session_lock:
+        _revoked_sessions[claims["sid"]] = claims["exp"]
+        _verified_tokens.pop(token, None)
+        # Forget revocations whose tokens would have expired anyway
+        for sid, expiry in list(_revoked_sessions.items()):
+            if expiry <= now:
+                del _revoked_sessions[sid]
+
+
+def invalidate_user_sessions(username):
+    """Invalidate every session issued to a user so far."""
+    with _session_lock:
+        _user_generations[username] = _user_generations.get(username, 0) + 1
+        for token, claims in list(_verified_tokens.items()):
+            if claims["username"] == username:
+                del _verified_tokens[token]
+
+
+def update_user_role(username, new_role):
+    """
+    Change a user's role and invalidate their existing sessions, so the old
+    role stops being honoured on the next page load.
+
+    Returns:
+        bool: True if the user exists
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET role = ? WHERE username = ?", (new_role, username))
+    conn.commit()
+    updated = cursor.rowcount > 0
+    conn.close()
+    if updated:
+        invalidate_user_sessions(username)
+    return updated
+
+
+def start_session(user_data):
+    """Record a successful login in st.session_state."""
+    st.session_state.session_token = issue_session_token(user_data)
+    st.session_state.logged_in = True
+    st.session_state.username = user_data['username']
+    st.session_state.role = user_data['role']
+    st.session_state.user_id = user_data['id']
+
+
+def flush_incident_buffer(username):
+    """Flush the session's pending incident edits, reporting (not raising) errors."""
+    try:
+        sync_session_incident_buffer(username)
+    except Exception as e:
+        st.error(f"Could not save pending incident changes: {e}")
+
+
+def require_login():
+    """
+    Page guard: stop the page unless the session holds a valid token.
+
+    Returns:
+        dict: The session's claims (id, username, role, ...)
+    """
+    initialize_session_state()
+    claims = verify_session_token(st.session_state.session_token)
+    if claims is None:
+        flush_incident_buffer(None)
+        st.session_state.logged_in = False
+        st.session_state.session_token = None
+        st.error("🚫 You must be logged in to view this page")
+        if st.button("Go to Login"):
+            st.switch_page("Home.py")
+        st.stop()
+
+    # The token is the source of truth for who is logged in and with what role
+    st.session_state.logged_in = True
+    st.session_state.username = claims["username"]
+    st.session_state.role = claims["role"]
+    st.session_state.user_id = claims["id"]
+    flush_incident_buffer(claims["username"])
+    return claims
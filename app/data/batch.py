@@ -0,0 +1,160 @@
+"""
+Shared helpers for the bulk CRUD functions in incidents.py, tickets.py
+and datasets.py.
+
+Every helper runs its statements with executemany inside one transaction,
+so a batch of N rows costs one commit instead of N.
+"""
+from collections.abc import Mapping
+from .cache import bump_table_version
+
+# Stay well below SQLite's host-parameter limit when building IN (...) lists
+MAX_IN_PARAMS = 500
+
+
+def _chunks(values, size=MAX_IN_PARAMS):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def begin_write(conn):
+    """Take the write lock up front so the batch sees a stable table."""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def existing_ids(conn, table_name, ids):
+    """
+    Which of the given row ids exist in a table.
+
+    Returns:
+        set: The ids that were found
+    """
+    found = set()
+    for chunk in _chunks(list(ids)):
+        placeholders = ", ".join("?" for _ in chunk)
+        cursor = conn.execute(
+            f"SELECT id FROM {table_name} WHERE id IN ({placeholders})", chunk
+        )
+        found.update(row[0] for row in cursor)
+    return found
+
+
+def as_rows(records, fields, defaults=None):
+    """
+    Normalise records to tuples in `fields` order.
+
+    Records may be dicts keyed by field name or sequences in field order;
+    missing trailing/optional fields fall back to `defaults`.
+    """
+    defaults = defaults or {}
+    rows = []
+    for record in records:
+        if isinstance(record, Mapping):
+            rows.append(tuple(record.get(f, defaults.get(f)) for f in fields))
+        else:
+            values = list(record)
+            values += [defaults.get(f) for f in fields[len(values):]]
+            rows.append(tuple(values))
+    return rows
+
+
+def batch_insert(conn, table_name, columns, rows):
+    """
+    Insert many rows in one transaction.
+
+    Args:
+        conn: Database connection
+        table_name: Table to insert into
+        columns: Column names, in the order of each row tuple
+        rows: List of row tuples
+
+    Returns:
+        list: Row ids of the inserted rows, in input order
+    """
+    if not rows:
+        return []
+    column_list = ", ".join(columns)
+    placeholders = ", ".join("?" for _ in columns)
+    try:
+        begin_write(conn)
+        conn.executemany(
+            f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})",
+            rows
+        )
+        # The write lock is held for the whole transaction, so AUTOINCREMENT
+        # hands out one contiguous run of ids ending at last_insert_rowid().
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    bump_table_version(table_name)
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+def batch_update_column(conn, table_name, column, updates):
+    """
+    Set one column on many rows in one transaction.
+
+    Args:
+        conn: Database connection
+        table_name: Table to update
+        column: Column to set
+        updates: Mapping of {row_id: value} or iterable of (row_id, value)
+
+    Returns:
+        dict: requested, updated and missing (ids that were not found)
+    """
+    if isinstance(updates, Mapping):
+        updates = updates.items()
+    pairs = [(row_id, value) for row_id, value in updates]
+    if not pairs:
+        return {"requested": 0, "updated": 0, "missing": []}
+    try:
+        begin_write(conn)
+        found = existing_ids(conn, table_name, [row_id for row_id, _ in pairs])
+        cursor = conn.executemany(
+            f"UPDATE {table_name} SET {column} = ? WHERE id = ?",
+            [(value, row_id) for row_id, value in pairs]
+        )
+        updated = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    bump_table_version(table_name)
+    missing = sorted({row_id for row_id, _ in pairs} - found)
+    return {"requested": len(pairs), "updated": updated, "missing": missing}
+
+
+def batch_delete(conn, table_name, ids):
+    """
+    Delete many rows by id in one transaction.
+
+    Args:
+        conn: Database connection
+        table_name: Table to delete from
+        ids: Iterable of row ids
+
+    Returns:
+        dict: requested, deleted and missing (ids that were not found)
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return {"requested": 0, "deleted": 0, "missing": []}
+    try:
+        begin_write(conn)
+        found = existing_ids(conn, table_name, ids)
+        cursor = conn.executemany(
+            f"DELETE FROM {table_name} WHERE id = ?",
+            [(row_id,) for row_id in ids]
+        )
+        deleted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    bump_table_version(table_name)
+    missing = [row_id for row_id in ids if row_id not in found]
+    return {"requested": len(ids), "deleted": deleted, "missing": missing}
@@ -0,0 +1,201 @@
+"""
+Process-wide result cache for the data-access functions.
+
+Entries are keyed by function, arguments and the current version counter
+of every table the function reads. Write paths call bump_table_version(),
+so the next read builds a new key and misses - writes show up immediately,
+and the stale entries simply age out of the LRU. Concurrent misses on the
+same key are coalesced into one query (see app.data.singleflight).
+
+Usage:
+    @cached_query("cyber_incidents")
+    def get_incidents_by_type_count(conn): ...
+"""
+import functools
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+import pandas as pd
+from .db import DB_PATH, current_snapshot
+from .singleflight import get_flights
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_versions = defaultdict(int)
+_versions_lock = threading.Lock()
+
+
+def bump_table_version(*table_names):
+    """Invalidate cached results that read any of these tables."""
+    with _versions_lock:
+        for table_name in table_names:
+            _versions[table_name] += 1
+
+
+def table_versions(table_names):
+    """
+    Current version counters for the given tables, as a tuple.
+
+    Inside a read_snapshot() these are the counters captured just before
+    the snapshot's read transaction started, so writes landing mid-render
+    don't switch its getters to results newer than the data they read
+    themselves, and its results are never stored under newer versions.
+    """
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return tuple(snapshot["versions"].get(t, 0) for t in table_names)
+    with _versions_lock:
+        return tuple(_versions[t] for t in table_names)
+
+
+def capture_table_versions():
+    """Copy of every table's version counter, taken by read_snapshot()."""
+    with _versions_lock:
+        return dict(_versions)
+
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached value, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        # e.g. a metrics bundle holding DataFrames
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """LRU cache bounded by both entry count and total size in bytes."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """Look up a key without touching the LRU order or hit counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry[0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache = QueryCache()
+
+
+def get_cache():
+    """The process-wide QueryCache."""
+    return _cache
+
+
+def _freeze(value):
+    """Turn an argument into a hashable cache-key component."""
+    if isinstance(value, sqlite3.Connection):
+        # Results depend on which database file the connection points at
+        return ("db", value.execute("PRAGMA database_list").fetchone()[2])
+    if hasattr(value, "compile"):
+        return ("query", value.compile())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    hash(value)
+    return value
+
+
+def _copy(value):
+    """Hand out copies of DataFrames so callers can't mutate the cached one."""
+    return value.copy() if isinstance(value, pd.DataFrame) else value
+
+
+def cached_query(*table_names):
+    """
+    Decorator: cache a read function's result until one of its tables is written.
+
+    Args:
+        table_names: Tables the function reads
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = (
+                    name,
+                    str(DB_PATH),
+                    _freeze(args),
+                    _freeze(kwargs),
+                    table_versions(table_names),
+                )
+            except TypeError:
+                # Unhashable argument - don't cache this call
+                return func(*args, **kwargs)
+
+            result = _cache.get(key, _MISSING)
+            if result is not _MISSING:
+                return _copy(result)
+
+            def load():
+                # A flight for this key may have finished just before we started
+                cached = _cache.peek(key, _MISSING)
+                if cached is not _MISSING:
+                    return cached
+                value = func(*args, **kwargs)
+                _cache.put(key, value)
+                return value
+
+            return _copy(get_flights().do(key, load))
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+_MISSING = object()
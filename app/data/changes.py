@@ -0,0 +1,206 @@
+"""
+Change feed for live dashboards.
+
+Triggers on the watched tables append one row per insert, update and
+delete to the `changes` table, so every write path (single-row CRUD, batch
+APIs, CSV loads, other processes) is captured. Sequence numbers come from
+an AUTOINCREMENT key: strictly increasing and never reused.
+
+A dashboard remembers the last seq it has applied and polls
+changes_since(seq), which returns only the rows touched since then -
+a primary-key range read instead of re-reading whole tables. The feed
+keeps the newest CHANGE_FEED_MAX_ROWS entries; a consumer that falls
+further behind gets reset=True and reloads from scratch.
+
+Usage:
+    with read_snapshot():
+        seq = latest_seq()
+        frame = query_incidents().limit(100).fetch()
+    ...
+    delta = changes_since(seq)
+    seq = delta["seq"]
+    frame = apply_changes(frame, delta["tables"]["cyber_incidents"])
+"""
+import pandas as pd
+from .db import pooled_connection, read_snapshot
+
+CHANGE_FEED_TABLES = ("cyber_incidents", "it_tickets")
+# Oldest entries are dropped by the insert trigger beyond this many
+CHANGE_FEED_MAX_ROWS = 100_000
+# Most changes one changes_since() call returns
+DEFAULT_CHANGE_LIMIT = 1000
+
+INSERT = "I"
+UPDATE = "U"
+DELETE = "D"
+
+
+def create_change_feed(conn):
+    """
+    Create the changes table and its triggers if they don't exist.
+
+    Args:
+        conn: Database connection object
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        op TEXT NOT NULL,
+        changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+    # Keep the feed bounded: each append drops whatever fell out of the window
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_changes_retention AFTER INSERT ON changes
+    BEGIN
+        DELETE FROM changes WHERE seq <= NEW.seq - {CHANGE_FEED_MAX_ROWS};
+    END;
+    """)
+    for table_name in CHANGE_FEED_TABLES:
+        for event, op, row in (("INSERT", INSERT, "NEW"), ("UPDATE", UPDATE, "NEW"),
+                               ("DELETE", DELETE, "OLD")):
+            cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_changes_{event.lower()}
+            AFTER {event} ON {table_name}
+            BEGIN
+                INSERT INTO changes (table_name, row_id, op) VALUES ('{table_name}', {row}.id, '{op}');
+            END;
+            """)
+    conn.commit()
+    print(" Change feed created successfully!")
+
+
+def latest_seq(conn=None):
+    """
+    Sequence number of the newest change (0 if there are none).
+
+    Read it in the same read_snapshot() as the data it goes with, so no
+    change falls between the two.
+    """
+    sql = "SELECT COALESCE(MAX(seq), 0) FROM changes"
+    if conn is not None:
+        return conn.execute(sql).fetchone()[0]
+    with pooled_connection() as conn:
+        return conn.execute(sql).fetchone()[0]
+
+
+def _read_changes(conn, seq, tables, limit):
+    placeholders = ", ".join("?" for _ in tables)
+    rows = conn.execute(f"""
+        SELECT seq, table_name, row_id, op FROM changes
+        WHERE seq > ? AND table_name IN ({placeholders})
+        ORDER BY seq
+        LIMIT ?
+    """, (seq, *tables, limit + 1)).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    oldest = conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+    # Entries after seq were pruned before we read them
+    reset = oldest is not None and seq < oldest - 1
+    new_seq = rows[-1][0] if rows else max(seq, latest_seq(conn))
+
+    result = {"seq": new_seq, "more": more, "reset": reset, "tables": {}}
+    for table_name in tables:
+        ops = {}
+        inserted = set()
+        for _, name, row_id, op in rows:
+            if name != table_name:
+                continue
+            if op == INSERT:
+                inserted.add(row_id)
+            ops[row_id] = op
+
+        # Net effect per row: inserted-then-updated (e.g. by the epoch
+        # trigger) is an insert, inserted-then-deleted is nothing
+        counts = {INSERT: 0, UPDATE: 0, DELETE: 0}
+        for row_id, op in ops.items():
+            if row_id in inserted:
+                counts[INSERT] += op != DELETE
+            else:
+                counts[op] += 1
+
+        changed = [row_id for row_id, op in ops.items() if op != DELETE]
+        upserts = _fetch_rows(conn, table_name, changed)
+        # A row updated and then deleted by a later, unread change is gone too
+        present = set(upserts["id"]) if len(upserts) else set()
+        deletes = [row_id for row_id, op in ops.items() if op == DELETE or row_id not in present]
+        result["tables"][table_name] = {
+            "upserts": upserts,
+            "deletes": deletes,
+            "inserted": sorted(inserted & present),
+            "counts": counts,
+        }
+    return result
+
+
+def _fetch_rows(conn, table_name, ids, chunk_size=500):
+    if not ids:
+        return pd.read_sql_query(f"SELECT * FROM {table_name} WHERE 0", conn)
+    frames = []
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        frames.append(pd.read_sql_query(
+            f"SELECT * FROM {table_name} WHERE id IN ({', '.join('?' for _ in chunk)})",
+            conn, params=chunk
+        ))
+    return pd.concat(frames, ignore_index=True)
+
+
+def changes_since(seq, tables=CHANGE_FEED_TABLES, limit=DEFAULT_CHANGE_LIMIT):
+    """
+    Rows changed after `seq`, collapsed to their current state.
+
+    The changes and the current rows are read in one snapshot, so
+    upserts show each row as of the returned seq.
+
+    Args:
+        seq: Last sequence number the caller has applied
+        tables: Tables to report on
+        limit: Most changes to read; check "more" and call again
+
+    Returns:
+        dict: {
+            "seq": sequence number to pass next time,
+            "more": True if changes remain after this batch,
+            "reset": True if the feed no longer reaches back to seq
+                (reload from scratch),
+            "tables": {table: {
+                "upserts": DataFrame of inserted/updated rows, current values,
+                "deletes": list of deleted row ids,
+                "inserted": ids among the upserts that are new rows,
+                "counts": {"I": n, "U": n, "D": n} net changed rows per kind,
+            }},
+        }
+    """
+    with read_snapshot() as conn:
+        return _read_changes(conn, seq, tuple(tables), limit)
+
+
+def apply_changes(frame, table_delta, sort_by="id", descending=True, max_rows=None):
+    """
+    Apply one table's changes_since() delta to a DataFrame of its rows.
+
+    Args:
+        frame: DataFrame with an id column
+        table_delta: changes_since(...)["tables"][table_name]
+        sort_by: Column to re-sort the result by
+        descending: Sort order
+        max_rows: Keep only the first max_rows after sorting (e.g. a "latest N" view)
+
+    Returns:
+        pandas.DataFrame: New frame with deleted rows dropped and upserts replacing
+            or adding rows
+    """
+    upserts = table_delta["upserts"]
+    gone = set(table_delta["deletes"]) | set(upserts["id"])
+    parts = [part for part in (frame[~frame["id"].isin(gone)], upserts.reindex(columns=frame.columns))
+             if len(part)]
+    result = pd.concat(parts, ignore_index=True) if parts else frame.iloc[0:0]
+    result = result.sort_values(sort_by, ascending=not descending, kind="stable")
+    if max_rows is not None:
+        result = result.head(max_rows)
+    return result.reset_index(drop=True)
@@ -1,5 +1,14 @@
 import pandas as pd
-from app.data.db import connect_database
+from app.data.db import pooled_connection
+from app.data.batch import as_rows, batch_insert, batch_update_column, batch_delete
+from app.data.query import Query
+from app.data.cache import cached_query, bump_table_version
+from app.data.timestamps import to_epoch
+
+# Read queries, kept at module level so app.data.query_plans can EXPLAIN them.
+ALL_DATASETS_SQL = "SELECT * FROM datasets_metadata ORDER BY id DESC"
+DATASETS_BY_CATEGORY_SQL = "SELECT * FROM datasets_metadata WHERE category = ? ORDER BY id DESC"
+DATASETS_BY_SOURCE_SQL = "SELECT * FROM datasets_metadata WHERE source = ? ORDER BY id DESC"
 
 def insert_dataset(dataset_name, category, source, last_updated, record_count, file_size_mb):
     """
@@ -16,27 +25,83 @@ def insert_dataset(dataset_name, category, source, last_updated, record_count, f
     Returns:
         int: ID of the newly inserted dataset
     """
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO datasets_metadata 
-        (dataset_name, category, source, last_updated, record_count, file_size_mb)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (dataset_name, category, source, last_updated, record_count, file_size_mb))
-    conn.commit()
-    dataset_id = cursor.lastrowid
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO datasets_metadata 
+            (name, category, source, upload_date, rows, file_size_mb)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (dataset_name, category, source, last_updated, record_count, file_size_mb))
+        dataset_id = cursor.lastrowid
+    bump_table_version("datasets_metadata")
     return dataset_id
 
 
+DATASET_FIELDS = ("dataset_name", "category", "source", "last_updated", "record_count", "file_size_mb")
+DATASET_COLUMNS = ("name", "category", "source", "upload_date", "rows", "file_size_mb")
+
+def insert_datasets(records):
+    """
+    Insert many datasets in a single transaction.
+
+    Args:
+        records: Iterable of dicts keyed like insert_dataset's arguments
+            (dataset_name, category, source, last_updated, record_count,
+            file_size_mb) or tuples in that order
+
+    Returns:
+        list: IDs of the new datasets, in input order
+    """
+    rows = as_rows(records, DATASET_FIELDS)
+    with pooled_connection() as conn:
+        return batch_insert(conn, "datasets_metadata", DATASET_COLUMNS, rows)
+
+
+@cached_query("datasets_metadata")
 def get_all_datasets():
     """Get all datasets as DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query("SELECT * FROM datasets_metadata ORDER BY id DESC", conn)
-    conn.close()
+    with pooled_connection() as conn:
+        df = pd.read_sql_query(ALL_DATASETS_SQL, conn)
     return df
 
 
+def query_datasets():
+    """
+    Start a composable query over datasets_metadata.
+
+    Example:
+        query_datasets().where(uploaded_by="data_scientist") \
+            .between("upload_date", "2024-01-01", "2024-07-01").fetch(conn)
+
+    Returns:
+        Query: Builder for datasets_metadata
+    """
+    return Query("datasets_metadata")
+
+
+@cached_query("datasets_metadata")
+def get_datasets_between(start=None, end=None, query=None, conn=None):
+    """
+    Get datasets whose upload_date falls in [start, end), oldest first.
+
+    Filters on the indexed upload_date_epoch column, so this is an index range scan.
+
+    Args:
+        start: Inclusive lower bound (date, datetime or string), optional
+        end: Exclusive upper bound, optional
+        query: Optional query_datasets() builder with extra filters
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        pandas.DataFrame: Matching datasets
+    """
+    query = query.copy() if query is not None else query_datasets()
+    return (query.between("upload_date_epoch", to_epoch(start), to_epoch(end))
+            .clear_order().order_by("upload_date_epoch").order_by("id")
+            .fetch(conn))
+
+
+@cached_query("datasets_metadata")
 def get_datasets_by_category(conn, category):
     """
     Retrieve datasets filtered by category.
@@ -48,11 +113,11 @@ def get_datasets_by_category(conn, category):
     Returns:
         pandas.DataFrame: Filtered datasets
     """
-    query = "SELECT * FROM datasets_metadata WHERE category = ? ORDER BY id DESC"
-    df = pd.read_sql_query(query, conn, params=(category,))
+    df = pd.read_sql_query(DATASETS_BY_CATEGORY_SQL, conn, params=(category,))
     return df
 
 
+@cached_query("datasets_metadata")
 def get_datasets_by_source(conn, source):
     """
     Retrieve datasets filtered by source.
@@ -64,8 +129,7 @@ def get_datasets_by_source(conn, source):
     Returns:
         pandas.DataFrame: Filtered datasets
     """
-    query = "SELECT * FROM datasets_metadata WHERE source = ? ORDER BY id DESC"
-    df = pd.read_sql_query(query, conn, params=(source,))
+    df = pd.read_sql_query(DATASETS_BY_SOURCE_SQL, conn, params=(source,))
     return df
 
 
@@ -87,6 +151,7 @@ def update_dataset_category(conn, dataset_id, new_category):
         (new_category, dataset_id)
     )
     conn.commit()
+    bump_table_version("datasets_metadata")
     rows_affected = cursor.rowcount
     
     if rows_affected > 0:
@@ -111,6 +176,7 @@ def delete_dataset(conn, dataset_id):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM datasets_metadata WHERE id = ?", (dataset_id,))
     conn.commit()
+    bump_table_version("datasets_metadata")
     rows_affected = cursor.rowcount
     
     if rows_affected > 0:
@@ -121,6 +187,35 @@ def delete_dataset(conn, dataset_id):
         return False
 
 
+def update_dataset_categories(conn, updates):
+    """
+    Update the category of many datasets in a single transaction.
+
+    Args:
+        conn: Database connection
+        updates: Mapping of {dataset_id: new_category} or iterable of
+            (dataset_id, new_category) pairs
+
+    Returns:
+        dict: requested, updated and missing dataset IDs
+    """
+    return batch_update_column(conn, "datasets_metadata", "category", updates)
+
+
+def delete_datasets(conn, dataset_ids):
+    """
+    Delete many datasets in a single transaction.
+
+    Args:
+        conn: Database connection
+        dataset_ids: Iterable of dataset IDs
+
+    Returns:
+        dict: requested, deleted and missing dataset IDs
+    """
+    return batch_delete(conn, "datasets_metadata", dataset_ids)
+
+
 def load_datasets_csv(csv_path):
     """
     Load datasets from CSV file into database.
@@ -134,7 +229,6 @@ def load_datasets_csv(csv_path):
         return 0
     
     try:
-        conn = connect_database()
         df = pd.read_csv(csv_path)
         
         # Clean column names
@@ -145,8 +239,9 @@ def load_datasets_csv(csv_path):
         print(f"  Rows: {len(df)}")
         
         # Load into database
-        df.to_sql('datasets_metadata', conn, if_exists='append', index=False)
-        conn.close()
+        with pooled_connection() as conn:
+            df.to_sql('datasets_metadata', conn, if_exists='append', index=False)
+        bump_table_version("datasets_metadata")
         
         print(f"  ✓ Loaded {len(df)} datasets")
         return len(df)
@@ -1,22 +1,267 @@
 import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
 from pathlib import Path
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
+# PRAGMAs applied once to every connection the pool opens.
+# WAL lets dashboard readers run while a writer commits, and
+# synchronous=NORMAL is safe under WAL (only the last commit can be lost on power failure).
+CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,   # 256 MB memory-mapped I/O
+    "cache_size": -64 * 1024,         # negative = KiB, so 64 MB page cache
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,             # ms to wait on a locked database
+    "foreign_keys": "ON",
+}
+
+DEFAULT_POOL_SIZE = 8
+
+
+def _apply_pragmas(conn):
+    """Apply CONNECTION_PRAGMAS to a freshly opened connection."""
+    for name, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
 
 def connect_database(db_path=DB_PATH):
     """
     Connect to the SQLite database.
     Creates the database file if it doesn't exist.
-    
+
+    The connection is tuned with the same PRAGMAs as pooled connections.
+    Callers own the connection and must close it.
+
     Args:
         db_path: Path to the database file
-        
+
     Returns:
         sqlite3.Connection: Database connection object
     """
     conn = sqlite3.connect(str(db_path))
+    _apply_pragmas(conn)
     return conn
 
 
+class ConnectionPool:
+    """
+    Thread-safe pool of tuned SQLite connections for one database file.
+
+    Connections are opened lazily up to max_size and reused afterwards,
+    so the PRAGMA setup and page cache survive between calls.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_size=DEFAULT_POOL_SIZE, timeout=30.0):
+        self.db_path = Path(db_path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _open(self):
+        """Open and tune a new connection."""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.timeout,
+            check_same_thread=False,
+        )
+        _apply_pragmas(conn)
+        return conn
+
+    def acquire(self):
+        """
+        Take a connection from the pool, opening one if below max_size.
+        Blocks up to `timeout` seconds when every connection is lent out.
+
+        Returns:
+            sqlite3.Connection: Pooled connection
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.max_size:
+                self._opened += 1
+                open_new = True
+            else:
+                open_new = False
+
+        if open_new:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No database connection available after {self.timeout}s"
+            ) from None
+
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any open transaction."""
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Lend out a connection for the duration of a `with` block.
+        Commits on success, rolls back on error, then returns it to the pool.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close every idle connection; lent-out ones are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Per-thread state of the active read_snapshot(), if any
+_local = threading.local()
+
+
+def _pool_key(db_path):
+    return str(Path(db_path).resolve())
+
+
+def get_pool(db_path=DB_PATH):
+    """Get (or create) the process-wide pool for a database file."""
+    key = _pool_key(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """Close every pool created by get_pool()."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+@contextmanager
+def pooled_connection(db_path=DB_PATH):
+    """
+    Borrow a pooled connection to the database.
+
+    Usage:
+        with pooled_connection() as conn:
+            conn.execute(...)
+
+    Inside read_snapshot() for the same database, this yields the
+    snapshot's connection instead, so existing getters join the snapshot.
+
+    Args:
+        db_path: Path to the database file
+
+    Yields:
+        sqlite3.Connection: Pooled connection (do not close it)
+    """
+    snapshot = current_snapshot()
+    if snapshot is not None and snapshot["db"] == _pool_key(db_path):
+        yield snapshot["conn"]
+        return
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+def current_snapshot():
+    """
+    The read_snapshot() active on this thread.
+
+    Returns:
+        dict or None: {"db", "conn", "versions"}, or None outside a snapshot
+    """
+    return getattr(_local, "snapshot", None)
+
+
+@contextmanager
+def read_snapshot(db_path=DB_PATH):
+    """
+    Run a block of reads against one consistent view of the database.
+
+    Holds a read transaction on a single pooled connection. Under WAL the
+    transaction sees the database as of its first query, and writers are
+    not blocked. Every pooled_connection() on this thread joins it, so the
+    existing getters need no changes. Cached getters use the table
+    versions captured just before the transaction started (see
+    app.data.cache.table_versions): tables are bumped after their writes
+    commit, so the snapshot's data is never older than those versions.
+    Nested snapshots reuse the outer one.
+
+    Only read inside the block. A write would upgrade the snapshot to a
+    write transaction, and it fails if another connection has committed
+    since the snapshot started.
+
+    Usage:
+        with read_snapshot():
+            incidents = get_incidents_page()
+            trend = get_incident_trend()
+
+    Args:
+        db_path: Path to the database file
+
+    Yields:
+        sqlite3.Connection: The snapshot's connection
+    """
+    active = current_snapshot()
+    if active is not None:
+        if active["db"] != _pool_key(db_path):
+            raise RuntimeError("A read snapshot of another database is already open")
+        yield active["conn"]
+        return
 
+    from .cache import capture_table_versions
 
+    with get_pool(db_path).connection() as conn:
+        versions = capture_table_versions()
+        # The WAL snapshot is taken at the first read, not at BEGIN
+        conn.execute("BEGIN")
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        _local.snapshot = {"db": _pool_key(db_path), "conn": conn, "versions": versions}
+        try:
+            yield conn
+        finally:
+            _local.snapshot = None
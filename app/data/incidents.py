@@ -1,30 +1,127 @@
 import pandas as pd
-from .db import connect_database
+from .db import pooled_connection
+from .batch import as_rows, batch_insert, batch_update_column, batch_delete
+from .query import Query
+from .pagination import fetch_page, NEXT, DEFAULT_PAGE_SIZE
+from .cache import cached_query, bump_table_version
+from .timestamps import to_epoch
+
+# Read queries, kept at module level so app.data.query_plans can EXPLAIN them.
+ALL_INCIDENTS_SQL = "SELECT * FROM cyber_incidents ORDER BY id DESC"
+INCIDENTS_BY_SEVERITY_SQL = "SELECT * FROM cyber_incidents WHERE severity = ? ORDER BY id DESC"
+INCIDENTS_BY_STATUS_SQL = "SELECT * FROM cyber_incidents WHERE status = ? ORDER BY id DESC"
+INCIDENTS_BY_TYPE_COUNT_SQL = """
+    SELECT category, COUNT(*) as count
+    FROM cyber_incidents
+    GROUP BY category
+    ORDER BY count DESC
+    """
+HIGH_SEVERITY_BY_STATUS_SQL = """
+    SELECT status, COUNT(*) as count
+    FROM cyber_incidents
+    WHERE severity = 'High'
+    GROUP BY status
+    ORDER BY count DESC
+    """
+INCIDENT_TYPES_WITH_MANY_CASES_SQL = """
+    SELECT category, COUNT(*) as count
+    FROM cyber_incidents
+    GROUP BY category
+    HAVING COUNT(*) > ?
+    ORDER BY count DESC
+    """
 
 def insert_incident(date, incident_type, severity, status, description, reported_by=None):
     """Insert new incident."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO cyber_incidents
-        (timestamp, category, severity, status, description, reported_by)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (date, incident_type, severity, status, description, reported_by))
-    conn.commit()
-    incident_id = cursor.lastrowid
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO cyber_incidents
+            (timestamp, category, severity, status, description, reported_by)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (date, incident_type, severity, status, description, reported_by))
+        incident_id = cursor.lastrowid
+    bump_table_version("cyber_incidents")
     return incident_id
 
+INCIDENT_FIELDS = ("date", "incident_type", "severity", "status", "description", "reported_by")
+INCIDENT_COLUMNS = ("timestamp", "category", "severity", "status", "description", "reported_by")
+
+def insert_incidents(records):
+    """
+    Insert many incidents in a single transaction.
+
+    Args:
+        records: Iterable of dicts keyed like insert_incident's arguments
+            (date, incident_type, severity, status, description, reported_by)
+            or tuples in that order
+
+    Returns:
+        list: IDs of the new incidents, in input order
+    """
+    rows = as_rows(records, INCIDENT_FIELDS)
+    with pooled_connection() as conn:
+        return batch_insert(conn, "cyber_incidents", INCIDENT_COLUMNS, rows)
+
+@cached_query("cyber_incidents")
 def get_all_incidents():
     """Get all incidents as DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents ORDER BY id DESC",
-        conn
-    )
-    conn.close()
+    with pooled_connection() as conn:
+        df = pd.read_sql_query(ALL_INCIDENTS_SQL, conn)
     return df
 
+def query_incidents():
+    """
+    Start a composable query over cyber_incidents.
+
+    Example:
+        query_incidents().where(severity=["High", "Critical"], status="Open") \
+            .order_by("timestamp", descending=True).limit(50).fetch(conn)
+
+    Returns:
+        Query: Builder for cyber_incidents
+    """
+    return Query("cyber_incidents")
+
+@cached_query("cyber_incidents")
+def get_incidents_page(cursor=None, direction=NEXT, page_size=DEFAULT_PAGE_SIZE, query=None, conn=None):
+    """
+    Get one keyset-paginated page of incidents, newest first.
+
+    Args:
+        cursor: id at the edge of the current page (None = newest page)
+        direction: pagination.NEXT (older) or pagination.PREV (newer)
+        page_size: Rows per page
+        query: Optional query_incidents() builder with filters to apply
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        tuple: (page DataFrame, next_cursor or None)
+    """
+    return fetch_page("cyber_incidents", cursor, direction, page_size, query, conn)
+
+@cached_query("cyber_incidents")
+def get_incidents_between(start=None, end=None, query=None, conn=None):
+    """
+    Get incidents whose timestamp falls in [start, end), oldest first.
+
+    Filters on the indexed timestamp_epoch column, so this is an index range scan.
+
+    Args:
+        start: Inclusive lower bound (date, datetime or string), optional
+        end: Exclusive upper bound, optional
+        query: Optional query_incidents() builder with extra filters
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        pandas.DataFrame: Matching incidents
+    """
+    query = query.copy() if query is not None else query_incidents()
+    return (query.between("timestamp_epoch", to_epoch(start), to_epoch(end))
+            .clear_order().order_by("timestamp_epoch").order_by("id")
+            .fetch(conn))
+
+@cached_query("cyber_incidents")
 def get_incidents_by_severity(conn, severity):
     """
     Retrieve incidents filtered by severity.
@@ -36,10 +133,10 @@ def get_incidents_by_severity(conn, severity):
     Returns:
         pandas.DataFrame: Filtered incidents
     """
-    query = "SELECT * FROM cyber_incidents WHERE severity = ? ORDER BY id DESC"
-    df = pd.read_sql_query(query, conn, params=(severity,))
+    df = pd.read_sql_query(INCIDENTS_BY_SEVERITY_SQL, conn, params=(severity,))
     return df
 
+@cached_query("cyber_incidents")
 def get_incidents_by_status(conn, status):
     """
     Retrieve incidents filtered by status.
@@ -51,8 +148,7 @@ def get_incidents_by_status(conn, status):
     Returns:
         pandas.DataFrame: Filtered incidents
     """
-    query = "SELECT * FROM cyber_incidents WHERE status = ? ORDER BY id DESC"
-    df = pd.read_sql_query(query, conn, params=(status,))
+    df = pd.read_sql_query(INCIDENTS_BY_STATUS_SQL, conn, params=(status,))
     return df
 
 def update_incident_status(conn, incident_id, new_status):
@@ -76,6 +172,7 @@ def update_incident_status(conn, incident_id, new_status):
     )
     
     conn.commit()
+    bump_table_version("cyber_incidents")
     rows_affected = cursor.rowcount
     
     if rows_affected > 0:
@@ -105,6 +202,7 @@ def delete_incident(conn, incident_id):
     )
     
     conn.commit()
+    bump_table_version("cyber_incidents")
     rows_affected = cursor.rowcount
     
     if rows_affected > 0:
@@ -113,47 +211,73 @@ def delete_incident(conn, incident_id):
     else:
         print(f"[ERROR] No incident found with ID {incident_id}.")
         return False
-    
+
+def update_incident_statuses(conn, updates):
+    """
+    Update the status of many incidents in a single transaction.
+
+    Args:
+        conn: Database connection
+        updates: Mapping of {incident_id: new_status} or iterable of
+            (incident_id, new_status) pairs
+
+    Returns:
+        dict: requested, updated and missing incident IDs
+    """
+    return batch_update_column(conn, "cyber_incidents", "status", updates)
+
+def delete_incidents(conn, incident_ids):
+    """
+    Delete many incidents in a single transaction.
+
+    Args:
+        conn: Database connection
+        incident_ids: Iterable of incident IDs
+
+    Returns:
+        dict: requested, deleted and missing incident IDs
+    """
+    return batch_delete(conn, "cyber_incidents", incident_ids)
+
+def delete_incidents_reported_by(conn, reported_by):
+    """
+    Delete every incident a user reported, in one statement.
+
+    Args:
+        conn: Database connection
+        reported_by: Username the incidents were reported by
+
+    Returns:
+        int: Number of incidents deleted
+    """
+    cursor = conn.execute("DELETE FROM cyber_incidents WHERE reported_by = ?", (reported_by,))
+    conn.commit()
+    bump_table_version("cyber_incidents")
+    return cursor.rowcount
+
+@cached_query("cyber_incidents")
 def get_incidents_by_type_count(conn):
     """
     Count incidents by type.
     Uses: SELECT, FROM, GROUP BY, ORDER BY
     """
-    query = """
-    SELECT category, COUNT(*) as count
-    FROM cyber_incidents
-    GROUP BY category
-    ORDER BY count DESC
-    """
-    df = pd.read_sql_query(query, conn)
+    df = pd.read_sql_query(INCIDENTS_BY_TYPE_COUNT_SQL, conn)
     return df
 
+@cached_query("cyber_incidents")
 def get_high_severity_by_status(conn):
     """
     Count high severity incidents by status.
     Uses: SELECT, FROM, WHERE, GROUP BY, ORDER BY
     """
-    query = """
-    SELECT status, COUNT(*) as count
-    FROM cyber_incidents
-    WHERE severity = 'High'
-    GROUP BY status
-    ORDER BY count DESC
-    """
-    df = pd.read_sql_query(query, conn)
+    df = pd.read_sql_query(HIGH_SEVERITY_BY_STATUS_SQL, conn)
     return df
 
+@cached_query("cyber_incidents")
 def get_incident_types_with_many_cases(conn, min_count=5):
     """
     Find incident types with more than min_count cases.
     Uses: SELECT, FROM, GROUP BY, HAVING, ORDER BY
     """
-    query = """
-    SELECT incident_type, COUNT(*) as count
-    FROM cyber_incidents
-    GROUP BY incident_type
-    HAVING COUNT(*) > ?
-    ORDER BY count DESC
-    """
-    df = pd.read_sql_query(query, conn, params=(min_count,))
+    df = pd.read_sql_query(INCIDENT_TYPES_WITH_MANY_CASES_SQL, conn, params=(min_count,))
     return df
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Ingest ledger: remembers which source files have been loaded, and how far.
+
+Each CSV is fingerprinted by size, mtime and SHA-256 content hash, together
+with the byte and row offset reached by the last ingest. On the next run:
+    - same size and mtime       -> skip (one stat + one primary-key lookup)
+    - same size and hash        -> skip, but refresh the stored mtime
+    - grown, old prefix intact  -> ingest only the appended tail
+    - anything else             -> re-ingest the whole file (rows are upserted)
+"""
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Ingest plans
+SKIP = "skip"
+TOUCH = "touch"
+TAIL = "tail"
+FULL = "full"
+
+
+def hash_file(path, limit=None):
+    """
+    SHA-256 of a file's content, optionally of only its first `limit` bytes.
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    remaining = limit
+    with Path(path).open("rb") as f:
+        while remaining is None or remaining > 0:
+            size = HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining)
+            block = f.read(size)
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def get_entry(conn, csv_path):
+    """
+    Get the ledger entry for a source file.
+
+    Returns:
+        dict or None: Ledger row as a dict, None if never ingested
+    """
+    cursor = conn.execute(
+        "SELECT source_path, table_name, size_bytes, mtime_ns, content_hash, "
+        "byte_offset, row_offset FROM ingest_ledger WHERE source_path = ?",
+        (str(Path(csv_path).resolve()),)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    keys = ("source_path", "table_name", "size_bytes", "mtime_ns",
+            "content_hash", "byte_offset", "row_offset")
+    return dict(zip(keys, row))
+
+
+def plan_ingest(conn, csv_path):
+    """
+    Decide how much of a source file needs ingesting.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to CSV file
+
+    Returns:
+        tuple: (plan, entry) where plan is SKIP, TOUCH, TAIL or FULL and entry
+            is the existing ledger entry (or None)
+    """
+    path = Path(csv_path)
+    stat = path.stat()
+    entry = get_entry(conn, path)
+    if entry is None:
+        return FULL, None
+
+    if stat.st_size == entry["size_bytes"] and stat.st_mtime_ns == entry["mtime_ns"]:
+        return SKIP, entry
+
+    if stat.st_size == entry["size_bytes"] and hash_file(path) == entry["content_hash"]:
+        return TOUCH, entry
+
+    offset = entry["byte_offset"]
+    if stat.st_size > offset > 0:
+        # Only a pure append is safe to resume: the old content must be intact
+        # and must have ended on a line boundary.
+        with path.open("rb") as f:
+            f.seek(offset - 1)
+            ends_on_newline = f.read(1) == b"\n"
+        if ends_on_newline and hash_file(path, limit=offset) == entry["content_hash"]:
+            return TAIL, entry
+
+    return FULL, entry
+
+
+def record_ingest(conn, csv_path, table_name, size_bytes, mtime_ns, row_offset):
+    """
+    Store the fingerprint of a file that has just been ingested.
+    Does not commit - call inside the same transaction as the data load.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to CSV file
+        table_name: Table the file was loaded into
+        size_bytes: File size that was ingested (also the new byte offset)
+        mtime_ns: File mtime when it was fingerprinted
+        row_offset: Total data rows ingested from this file so far
+    """
+    conn.execute(
+        """
+        INSERT INTO ingest_ledger
+        (source_path, table_name, size_bytes, mtime_ns, content_hash,
+         byte_offset, row_offset, ingested_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source_path) DO UPDATE SET
+            table_name = excluded.table_name,
+            size_bytes = excluded.size_bytes,
+            mtime_ns = excluded.mtime_ns,
+            content_hash = excluded.content_hash,
+            byte_offset = excluded.byte_offset,
+            row_offset = excluded.row_offset,
+            ingested_at = excluded.ingested_at
+        """,
+        (
+            str(Path(csv_path).resolve()), table_name, size_bytes, mtime_ns,
+            hash_file(csv_path, limit=size_bytes), size_bytes, row_offset,
+            datetime.now().isoformat(timespec="seconds"),
+        )
+    )
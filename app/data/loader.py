@@ -1,88 +1,462 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from pathlib import Path
 from .db import connect_database
-from .schema import create_all_tables
+from .schema import create_all_tables, NATURAL_KEYS
+from . import ledger
+from .cache import bump_table_version
+from .timestamps import add_epoch_column
 
 DATA_DIR = Path("DATA")
 
-def load_csv_to_table(conn, csv_path, table_name):
+# Streaming ingest defaults
+DEFAULT_CHUNK_ROWS = 50_000
+SAMPLE_ROWS = 1_000
+# Python tuples built from a chunk take roughly twice the DataFrame's footprint
+ROW_CONVERSION_OVERHEAD = 2
+
+# Map CSV columns to database columns, per table
+COLUMN_MAPPINGS = {
+    'cyber_incidents': {
+        'incident_id': 'incident_id',
+        'timestamp': 'timestamp',
+        'category': 'category',
+        'severity': 'severity',
+        'status': 'status',
+        'description': 'description'
+    },
+}
+
+
+# Columns that must be non-empty for a row to be inserted
+REQUIRED_COLUMNS = {
+    'cyber_incidents': ('timestamp', 'severity', 'status'),
+    'it_tickets': ('status',),
+    'datasets_metadata': ('name',),
+}
+
+# Domain CSV files and the table each one loads into
+CSV_SOURCES = [
+    ("cyber_incidents.csv", "cyber_incidents"),
+    ("datasets_metadata.csv", "datasets_metadata"),
+    ("it_tickets.csv", "it_tickets"),
+]
+
+
+def print_progress(table_name, rows_done, bytes_done, total_bytes):
+    """Default progress reporter: one line per committed chunk."""
+    percent = (bytes_done / total_bytes * 100) if total_bytes else 100.0
+    print(f"   ... {rows_done} rows into '{table_name}' ({percent:.0f}% of file)")
+
+
+def estimate_chunk_rows(csv_path, max_memory_mb):
     """
-    Load a CSV file into a database table using pandas.
-    
+    Pick a chunk size (in rows) that keeps one chunk under a memory ceiling.
+
+    The per-row footprint is measured on a small sample of the file.
+
+    Args:
+        csv_path: Path to CSV file
+        max_memory_mb: Memory ceiling for one chunk, in MB
+
+    Returns:
+        int: Rows per chunk (at least 1)
+    """
+    sample = pd.read_csv(csv_path, nrows=SAMPLE_ROWS)
+    if sample.empty:
+        return DEFAULT_CHUNK_ROWS
+    bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+    budget = max_memory_mb * 1024 * 1024
+    return max(1, int(budget / (bytes_per_row * ROW_CONVERSION_OVERHEAD)))
+
+
+def prepare_chunk(df, table_name):
+    """
+    Clean column names, apply the table's column mapping and derive the
+    epoch column from the timestamp text.
+    """
+    df.columns = df.columns.str.strip()
+    mapping = COLUMN_MAPPINGS.get(table_name)
+    if mapping:
+        # Only rename columns that exist and need renaming
+        available_cols = df.columns.tolist()
+        df = df.rename(columns={k: v for k, v in mapping.items() if k in available_cols})
+    return add_epoch_column(df, table_name)
+
+
+def validate_chunk(df, table_name):
+    """
+    Drop rows missing a value for one of the table's required columns.
+
+    Returns:
+        pandas.DataFrame: The rows that can be inserted
+    """
+    required = [c for c in REQUIRED_COLUMNS.get(table_name, ()) if c in df.columns]
+    if not required:
+        return df
+    valid = df[required].notna().all(axis=1)
+    dropped = int((~valid).sum())
+    if dropped:
+        print(f"   Skipping {dropped} rows with missing {', '.join(required)}")
+        df = df[valid]
+    return df
+
+
+def chunk_to_rows(df):
+    """Convert a DataFrame chunk to plain tuples, with NaN as NULL."""
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def build_insert_sql(table_name, columns):
+    """
+    Build a parameterized INSERT for the given columns.
+
+    If the columns include the table's natural key (see NATURAL_KEYS), the
+    statement upserts on it, so re-loading a row updates it in place.
+    """
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+
+    key = NATURAL_KEYS.get(table_name)
+    if key in columns:
+        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in columns if c != key)
+        if updates:
+            sql += f" ON CONFLICT({key}) DO UPDATE SET {updates}"
+        else:
+            sql += f" ON CONFLICT({key}) DO NOTHING"
+    return sql
+
+
+def open_csv_reader(f, csv_path, start_offset, chunksize):
+    """
+    Chunked CSV reader over an open binary file, starting at a byte offset.
+
+    A non-zero offset resumes just after the last ingested line, reusing the
+    file's header row for column names.
+    """
+    if start_offset == 0:
+        return pd.read_csv(f, chunksize=chunksize)
+    names = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    f.seek(start_offset)
+    return pd.read_csv(f, header=None, names=names, chunksize=chunksize)
+
+
+def resolve_chunksize(csv_path, chunksize=None, max_memory_mb=None):
+    """Rows per chunk: explicit, derived from a memory ceiling, or the default."""
+    if chunksize is not None:
+        return chunksize
+    if max_memory_mb is not None:
+        return estimate_chunk_rows(csv_path, max_memory_mb)
+    return DEFAULT_CHUNK_ROWS
+
+
+def resolve_ingest_plan(conn, csv_path, table_name, incremental=True):
+    """
+    Consult the ingest ledger for a file.
+
+    Returns:
+        tuple or None: (start_byte_offset, row_offset) to load from,
+            or None if nothing needs loading
+    """
+    if not incremental:
+        return 0, 0
+    plan, entry = ledger.plan_ingest(conn, csv_path)
+    if plan == ledger.SKIP:
+        print(f"\n {csv_path} unchanged since last load. Skipping.")
+        return None
+    if plan == ledger.TOUCH:
+        print(f"\n {csv_path} only had its mtime changed. Skipping.")
+        stat = Path(csv_path).stat()
+        ledger.record_ingest(conn, csv_path, table_name, stat.st_size, stat.st_mtime_ns, entry["row_offset"])
+        conn.commit()
+        return None
+    if plan == ledger.TAIL:
+        return entry["byte_offset"], entry["row_offset"]
+    return 0, 0
+
+
+def load_csv_to_table(conn, csv_path, table_name, chunksize=None, max_memory_mb=None,
+                      progress=print_progress, incremental=True):
+    """
+    Stream a CSV file into a database table in bounded chunks.
+
+    Each chunk is inserted with executemany; the whole file is loaded
+    inside a single transaction, so a failure leaves the table untouched.
+    Rows are upserted on the table's natural key.
+
+    With incremental=True the ingest ledger is consulted first: unchanged
+    files are skipped, and files that were only appended to load just
+    their new tail.
+
     Args:
         conn: Database connection
         csv_path: Path to CSV file
         table_name: Name of the database table
-        
+        chunksize: Rows per chunk (default: derived from max_memory_mb,
+            or DEFAULT_CHUNK_ROWS)
+        max_memory_mb: Memory ceiling for one chunk, in MB
+        progress: Callable(table_name, rows_done, bytes_done, total_bytes)
+            called after each chunk, or None to stay quiet
+        incremental: Use the ingest ledger to skip already-loaded data
+
     Returns:
         int: Number of rows loaded
     """
     path = Path(csv_path)
-    
+
     # Check if file exists
     if not path.exists():
         print(f" Warning: {csv_path} not found. Skipping.")
         return 0
-    
-    # Read CSV into DataFrame
-    df = pd.read_csv(path)
-    
-    # Clean column names (remove extra whitespace)
-    df.columns = df.columns.str.strip()
-    
-    # Map CSV columns to database columns for cyber_incidents
-    if table_name == 'cyber_incidents':
-        column_mapping = {
-            'incident_id': 'incident_id',
-            'timestamp': 'timestamp',
-            'category': 'category',
-            'severity': 'severity',
-            'status': 'status',
-            'description': 'description'
+
+    stat = path.stat()
+    offsets = resolve_ingest_plan(conn, path, table_name, incremental)
+    if offsets is None:
+        return 0
+    start_offset, row_offset = offsets
+    chunksize = resolve_chunksize(path, chunksize, max_memory_mb)
+
+    total_bytes = stat.st_size
+    if start_offset:
+        print(f"\n Loading new rows of {csv_path} from byte {start_offset} in chunks of {chunksize} rows...")
+    else:
+        print(f"\n Loading {csv_path} in chunks of {chunksize} rows...")
+
+    rows_loaded = 0
+    cursor = conn.cursor()
+    with path.open("rb") as f:
+        try:
+            # The first INSERT opens an implicit transaction that spans every chunk
+            for chunk in open_csv_reader(f, path, start_offset, chunksize):
+                chunk = validate_chunk(prepare_chunk(chunk, table_name), table_name)
+                if rows_loaded == 0:
+                    print(f"   Columns: {list(chunk.columns)}")
+                cursor.executemany(
+                    build_insert_sql(table_name, chunk.columns),
+                    chunk_to_rows(chunk)
+                )
+                rows_loaded += len(chunk)
+                if progress:
+                    progress(table_name, rows_loaded, f.tell(), total_bytes)
+            if incremental:
+                ledger.record_ingest(conn, path, table_name, stat.st_size, stat.st_mtime_ns,
+                                     row_offset + rows_loaded)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    bump_table_version(table_name)
+
+    print(f"    Loaded {rows_loaded} rows into '{table_name}' table.")
+    return rows_loaded
+
+def _parse_csv_worker(csv_path, table_name, start_offset, chunksize, batch_queue):
+    """
+    Process-pool worker: parse and validate one CSV into typed row batches.
+
+    Batches are put on batch_queue as ("batch", path, columns, rows) and
+    followed by ("done", path, rows, parse_seconds).
+    """
+    started = time.perf_counter()
+    rows_parsed = 0
+    with Path(csv_path).open("rb") as f:
+        for chunk in open_csv_reader(f, csv_path, start_offset, chunksize):
+            chunk = validate_chunk(prepare_chunk(chunk, table_name), table_name)
+            rows = chunk_to_rows(chunk)
+            rows_parsed += len(rows)
+            batch_queue.put(("batch", str(csv_path), list(chunk.columns), rows))
+    batch_queue.put(("done", str(csv_path), rows_parsed, time.perf_counter() - started))
+    return rows_parsed
+
+
+def _write_batches(db_path, jobs, batch_queue, stats, errors, incremental):
+    """
+    Single writer thread: drain batch_queue into SQLite in one transaction.
+
+    Stops at the ("stop",) sentinel; records each finished file in the
+    ingest ledger before the final commit. The ("abort",) sentinel (a
+    parse worker failed) rolls back everything written so far instead.
+    """
+    conn = connect_database(db_path)
+    cursor = conn.cursor()
+    stopped = False
+    try:
+        while True:
+            message = batch_queue.get()
+            kind = message[0]
+            if kind == "abort":
+                stopped = True
+                conn.rollback()
+                return
+            if kind == "stop":
+                stopped = True
+                break
+            csv_path = message[1]
+            job = jobs[csv_path]
+            if kind == "batch":
+                _, _, columns, rows = message
+                cursor.executemany(build_insert_sql(job["table_name"], columns), rows)
+                stats[csv_path]["rows"] += len(rows)
+            elif kind == "done":
+                stats[csv_path]["parse_seconds"] = message[3]
+                stats[csv_path]["finished"] = time.perf_counter()
+        if incremental:
+            for csv_path, job in jobs.items():
+                if "finished" in stats[csv_path]:
+                    ledger.record_ingest(conn, csv_path, job["table_name"], job["size_bytes"],
+                                         job["mtime_ns"], job["row_offset"] + stats[csv_path]["rows"])
+        conn.commit()
+        bump_table_version(*{job["table_name"] for job in jobs.values()})
+    except Exception as e:
+        conn.rollback()
+        errors.append(e)
+        # Keep draining so workers blocked on a full queue can finish
+        while not stopped:
+            stopped = batch_queue.get()[0] in ("stop", "abort")
+    finally:
+        conn.close()
+
+
+def load_csv_files_parallel(conn, sources, chunksize=None, max_memory_mb=None,
+                            incremental=True, max_workers=None, queue_size=8):
+    """
+    Parse several CSV files in a process pool and write them from one thread.
+
+    Parsing is CPU-bound and independent per file, so each file goes to its
+    own worker process. Typed batches flow back through a bounded queue to a
+    single writer thread, which commits everything (and the ledger entries)
+    in one transaction.
+
+    Args:
+        conn: Database connection (used for the ledger check; the writer
+            opens its own connection to the same file)
+        sources: (csv_path, table_name) pairs
+        chunksize: Rows per batch
+        max_memory_mb: Memory ceiling for one batch, in MB
+        incremental: Use the ingest ledger to skip already-loaded data
+        max_workers: Worker processes (default: one per file, capped at CPU count)
+        queue_size: Batches buffered between parsers and the writer
+
+    Returns:
+        list: One dict per loaded file with table, rows, parse_seconds
+            and rows_per_sec
+    """
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not db_path:
+        raise ValueError("Parallel loading needs a file-backed database")
+
+    jobs = {}
+    for csv_path, table_name in sources:
+        path = Path(csv_path)
+        if not path.exists():
+            print(f" Warning: {csv_path} not found. Skipping.")
+            continue
+        offsets = resolve_ingest_plan(conn, path, table_name, incremental)
+        if offsets is None:
+            continue
+        stat = path.stat()
+        jobs[str(path)] = {
+            "table_name": table_name,
+            "start_offset": offsets[0],
+            "row_offset": offsets[1],
+            "chunksize": resolve_chunksize(path, chunksize, max_memory_mb),
+            "size_bytes": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
         }
-        # Only rename columns that exist and need renaming
-        available_cols = df.columns.tolist()
-        df = df.rename(columns={k: v for k, v in column_mapping.items() if k in available_cols})
-    
-    # Preview data
-    print(f"\n Loading {csv_path}...")
-    print(f"   Columns: {list(df.columns)}")
-    print(f"   Rows: {len(df)}")
-    
-    # Load into database
-    df.to_sql(table_name, conn, if_exists='append', index=False)
-    
-    print(f"    Loaded {len(df)} rows into '{table_name}' table.")
-    return len(df)
-
-def load_all_csv_data(conn):
+    if not jobs:
+        return []
+
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+
+    stats = {csv_path: {"rows": 0} for csv_path in jobs}
+    errors = []
+    with multiprocessing.Manager() as manager:
+        batch_queue = manager.Queue(maxsize=queue_size)
+        writer = threading.Thread(
+            target=_write_batches,
+            args=(db_path, jobs, batch_queue, stats, errors, incremental),
+            name="csv-writer",
+        )
+        started = time.perf_counter()
+        writer.start()
+        parsed = False
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = [
+                    pool.submit(_parse_csv_worker, csv_path, job["table_name"],
+                                job["start_offset"], job["chunksize"], batch_queue)
+                    for csv_path, job in jobs.items()
+                ]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(e)
+            parsed = True
+        finally:
+            # A failed parse must not commit the other files' batches
+            batch_queue.put(("stop",) if parsed and not errors else ("abort",))
+            writer.join()
+
+    if errors:
+        raise errors[0]
+
+    results = []
+    for csv_path, job in jobs.items():
+        file_stats = stats[csv_path]
+        elapsed = file_stats.get("finished", time.perf_counter()) - started
+        rows_per_sec = file_stats["rows"] / elapsed if elapsed > 0 else 0.0
+        print(f"    {Path(csv_path).name}: {file_stats['rows']} rows into '{job['table_name']}' "
+              f"({rows_per_sec:,.0f} rows/sec, parsed in {file_stats.get('parse_seconds', 0):.2f}s)")
+        results.append({
+            "table_name": job["table_name"],
+            "source": csv_path,
+            "rows": file_stats["rows"],
+            "parse_seconds": file_stats.get("parse_seconds", 0.0),
+            "rows_per_sec": rows_per_sec,
+        })
+    return results
+
+def load_all_csv_data(conn, chunksize=None, max_memory_mb=None, incremental=True,
+                      parallel=False, max_workers=None):
     """
     Load all three domain CSV files into the database.
+
+    With parallel=True the files are parsed concurrently in a process pool
+    (see load_csv_files_parallel); otherwise they are streamed one by one.
     """
     print("\n Starting CSV data loading...")
-    
+
+    if parallel:
+        sources = [(DATA_DIR / name, table_name) for name, table_name in CSV_SOURCES]
+        results = load_csv_files_parallel(
+            conn, sources,
+            chunksize=chunksize,
+            max_memory_mb=max_memory_mb,
+            incremental=incremental,
+            max_workers=max_workers
+        )
+        total_rows = sum(r["rows"] for r in results)
+        print(f"\nTotal rows loaded: {total_rows}")
+        return total_rows
+
     total_rows = 0
-    
-    # Load cyber incidents
-    total_rows += load_csv_to_table(
-        conn,
-        DATA_DIR / "cyber_incidents.csv",
-        "cyber_incidents"
-    )
-    
-    # Load datasets metadata
-    total_rows += load_csv_to_table(
-        conn,
-        DATA_DIR / "datasets_metadata.csv",
-        "datasets_metadata"
-    )
-    
-    # Load IT tickets
-    total_rows += load_csv_to_table(
-        conn,
-        DATA_DIR / "it_tickets.csv",
-        "it_tickets"
-    )
-    
+    for name, table_name in CSV_SOURCES:
+        total_rows += load_csv_to_table(
+            conn,
+            DATA_DIR / name,
+            table_name,
+            chunksize=chunksize,
+            max_memory_mb=max_memory_mb,
+            incremental=incremental
+        )
+
     print(f"\nTotal rows loaded: {total_rows}")
-    return total_rows
\ No newline at end of file
+    return total_rows
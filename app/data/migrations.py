@@ -0,0 +1,194 @@
+"""
+Versioned schema registry.
+
+MIGRATIONS is the ordered list of forward steps from an empty (or legacy)
+database to the current schema. The schema_version table records each step
+once it has been applied, so startup is a single version check and only
+pending steps ever run.
+
+To change the schema, append a new (version, description, function) entry -
+never edit one that has shipped.
+
+Usage:
+    conn = connect_database()
+    migrate(conn)
+"""
+import sqlite3
+from datetime import datetime
+from .schema import (
+    TABLE_DEFINITIONS, create_ingest_ledger_table, create_natural_key_indexes, create_indexes,
+    create_login_throttle_table
+)
+from .timestamps import create_epoch_columns
+from .rollups import create_rollup_tables, rebuild_rollups
+from .cache import bump_table_version
+from .changes import create_change_feed
+
+# Columns that older schemas stored under a different name: table -> {new: old}
+# (DatabaseManager's schema and the first app.data schema disagreed on these)
+LEGACY_COLUMN_NAMES = {
+    "datasets_metadata": {"rows": "num_records", "upload_date": "last_updated", "name": "dataset_name"},
+    "it_tickets": {"created_at": "created_date", "resolved_at": "resolved_date"},
+}
+
+
+def _table_columns(conn, table_name):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+
+def _target_columns(conn, table_name):
+    """Columns of the canonical definition, read from a scratch temp table."""
+    scratch = f"_shape_{table_name}"
+    create_sql = TABLE_DEFINITIONS[table_name].replace(
+        f"CREATE TABLE IF NOT EXISTS {table_name}", f"CREATE TEMP TABLE {scratch}", 1
+    )
+    conn.execute(create_sql)
+    columns = _table_columns(conn, scratch)
+    conn.execute(f"DROP TABLE temp.{scratch}")
+    return columns
+
+
+def rebuild_table(conn, table_name):
+    """
+    Bring one table to its TABLE_DEFINITIONS shape.
+
+    Creates the table if missing. If it exists with different columns, the
+    rows are copied into a fresh table of the canonical shape (matching
+    columns by name, or by their LEGACY_COLUMN_NAMES alias), which also
+    re-applies column types. Indexes and triggers on the old table are
+    dropped with it; later migrations reinstall them.
+
+    Returns:
+        bool: True if the table was created or rebuilt
+    """
+    existing = _table_columns(conn, table_name)
+    if not existing:
+        conn.execute(TABLE_DEFINITIONS[table_name])
+        return True
+
+    target = _target_columns(conn, table_name)
+    if existing == target:
+        return False
+
+    aliases = LEGACY_COLUMN_NAMES.get(table_name, {})
+    copied, sources = [], []
+    for column in target:
+        if column in existing:
+            source = column
+        elif aliases.get(column) in existing:
+            source = aliases[column]
+        else:
+            continue
+        copied.append(f'"{column}"')
+        sources.append(f'"{source}"')
+
+    new_table = f"{table_name}__new"
+    conn.execute(f"DROP TABLE IF EXISTS {new_table}")
+    conn.execute(TABLE_DEFINITIONS[table_name].replace(
+        f"CREATE TABLE IF NOT EXISTS {table_name}", f"CREATE TABLE {new_table}", 1
+    ))
+    # OR IGNORE: rows the old, looser schema allowed (NULL in a NOT NULL
+    # column) can't be represented and are dropped
+    cursor = conn.execute(
+        f"INSERT OR IGNORE INTO {new_table} ({', '.join(copied)}) "
+        f"SELECT {', '.join(sources)} FROM {table_name}"
+    )
+    total = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+    if cursor.rowcount < total:
+        print(f" Dropped {total - cursor.rowcount} invalid rows from {table_name}")
+    conn.execute(f"DROP TABLE {table_name}")
+    conn.execute(f"ALTER TABLE {new_table} RENAME TO {table_name}")
+    print(f" Rebuilt {table_name} ({len(existing)} -> {len(target)} columns)")
+    return True
+
+
+def _unify_tables(conn):
+    conn.execute("BEGIN")
+    for table_name in TABLE_DEFINITIONS:
+        rebuild_table(conn, table_name)
+    conn.commit()
+    create_ingest_ledger_table(conn)
+
+
+def _install_derived_objects(conn):
+    create_natural_key_indexes(conn)
+    create_epoch_columns(conn)
+    create_indexes(conn)
+    create_rollup_tables(conn)
+    # Rows may have been de-duplicated before the rollup triggers existed
+    rebuild_rollups(conn)
+
+
+# (version, description, function(conn)). Append only.
+MIGRATIONS = [
+    (1, "unified domain tables and ingest ledger", _unify_tables),
+    (2, "natural keys, epoch columns, indexes and rollups", _install_derived_objects),
+    (3, "login throttle snapshots", create_login_throttle_table),
+    (4, "change feed for live dashboards", create_change_feed),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def create_schema_version_table(conn):
+    """Create the schema_version table if it doesn't exist."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TEXT NOT NULL
+    )
+    """)
+    conn.commit()
+
+
+def get_schema_version(conn):
+    """
+    Get the highest applied migration.
+
+    Returns:
+        int: Schema version, 0 for a database that predates the registry
+    """
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def migrate(conn, target=None):
+    """
+    Apply every pending migration, in order.
+
+    Each migration is written to be safe to re-run, so a step interrupted
+    before its version row was recorded is simply applied again next time.
+
+    Args:
+        conn: Database connection object
+        target: Stop after this version (default: LATEST_VERSION)
+
+    Returns:
+        int: Schema version after migrating
+    """
+    target = LATEST_VERSION if target is None else target
+    current = get_schema_version(conn)
+    if current >= target:
+        return current
+
+    create_schema_version_table(conn)
+    for version, description, apply in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        print(f" Applying migration {version}: {description}...")
+        apply(conn)
+        conn.execute(
+            "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+            (version, description, datetime.now().isoformat(timespec="seconds"))
+        )
+        conn.commit()
+        current = version
+
+    # Rebuilt tables may hold different rows than cached results assumed
+    bump_table_version(*TABLE_DEFINITIONS)
+    print(f" Schema is at version {current}")
+    return current
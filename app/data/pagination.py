@@ -0,0 +1,88 @@
+"""
+Keyset pagination over the domain tables.
+
+Pages are ordered newest first (id DESC) and addressed by the id at the
+edge of the previous page, so fetching page N costs the same as page 1 -
+an index seek on the rowid rather than an OFFSET scan.
+
+    page, cursor = fetch_page("cyber_incidents")                  # newest rows
+    page, cursor = fetch_page("cyber_incidents", cursor)          # older rows
+    page, cursor = fetch_page("cyber_incidents", first_id, PREV)  # newer rows
+"""
+from .db import pooled_connection
+from .query import Query
+
+NEXT = "next"  # towards older rows
+PREV = "prev"  # towards newer rows
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def fetch_page(table_name, cursor=None, direction=NEXT, page_size=DEFAULT_PAGE_SIZE,
+               query=None, conn=None):
+    """
+    Fetch one page of rows, newest first.
+
+    Args:
+        table_name: Table to page through
+        cursor: id at the edge of the current page (None = start at newest)
+        direction: NEXT for rows older than cursor, PREV for rows newer than it
+        page_size: Rows per page
+        query: Optional Query with filters/projection to page through
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        tuple: (page DataFrame ordered by id DESC, next_cursor) where
+            next_cursor continues in the same direction, or is None when
+            there are no more rows that way
+    """
+    q = query.copy().clear_order() if query is not None else Query(table_name)
+    if q.columns and "id" not in q.columns:
+        q.select("id", *q.columns)
+
+    if direction == NEXT:
+        if cursor is not None:
+            q.between("id", end=cursor)
+        q.order_by("id", descending=True)
+    elif direction == PREV:
+        if cursor is not None:
+            q.between("id", start=cursor + 1)
+        q.order_by("id")
+    else:
+        raise ValueError(f"Unknown direction: {direction}")
+
+    # One extra row tells us whether another page exists
+    q.limit(page_size + 1)
+    page = q.fetch(conn)
+
+    has_more = len(page) > page_size
+    page = page.iloc[:page_size]
+    if direction == PREV:
+        page = page.iloc[::-1]
+    page = page.reset_index(drop=True)
+
+    if not has_more or page.empty:
+        return page, None
+    edge = page["id"].iloc[-1] if direction == NEXT else page["id"].iloc[0]
+    return page, int(edge)
+
+
+def estimate_row_count(table_name, conn=None):
+    """
+    Cheap row-count estimate from the rowid range.
+
+    Costs two rowid b-tree lookups instead of a COUNT(*) scan; deleted
+    rows inside the range make it an over-estimate.
+
+    Returns:
+        int: Estimated number of rows
+    """
+    sql = f"SELECT MIN(id), MAX(id) FROM {table_name}"
+    if conn is not None:
+        low, high = conn.execute(sql).fetchone()
+    else:
+        with pooled_connection() as conn:
+            low, high = conn.execute(sql).fetchone()
+    if low is None:
+        return 0
+    return high - low + 1
@@ -0,0 +1,219 @@
+"""
+Composable query builder for the domain tables.
+
+Builds one parameterized SELECT from combined filters, so filtering runs in
+SQLite (over the indexes in schema.INDEXES) instead of in pandas.
+
+Usage:
+    df = (Query("cyber_incidents")
+          .where(severity=["High", "Critical"], status="Open")
+          .between("timestamp", "2024-01-01", "2024-07-01")
+          .order_by("timestamp", descending=True)
+          .select("id", "timestamp", "category", "severity")
+          .limit(100)
+          .fetch(conn))
+
+fetch() and count() without a connection borrow one from the pool, and
+identical reads running at the same moment (a live table refreshing in
+every open session) share one query - see app.data.singleflight.
+"""
+import copy
+import pandas as pd
+from .db import DB_PATH, current_snapshot, pooled_connection
+from .cache import table_versions
+from .singleflight import single_flight
+
+# Queryable columns per table. Identifiers can't be bound as parameters,
+# so every column name is checked against this list before it reaches SQL.
+TABLE_COLUMNS = {
+    "cyber_incidents": (
+        "id", "incident_id", "timestamp", "timestamp_epoch", "category",
+        "severity", "status", "description", "reported_by",
+    ),
+    "it_tickets": (
+        "id", "ticket_id", "priority", "status", "category", "subject",
+        "description", "assigned_to", "created_at", "created_at_epoch",
+        "resolved_at", "resolution_time_hours",
+    ),
+    "datasets_metadata": (
+        "id", "dataset_id", "name", "category", "source", "rows", "columns",
+        "file_size_mb", "uploaded_by", "upload_date", "upload_date_epoch",
+        "description",
+    ),
+}
+
+
+def _read_frame(conn, sql, params):
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def _read_scalar(conn, sql, params):
+    return conn.execute(sql, params).fetchone()[0]
+
+
+@single_flight(key_func=lambda read, sql, params, table_name: (
+    read.__name__, str(DB_PATH), sql, params, table_versions((table_name,))
+))
+def _shared_read(read, sql, params, table_name):
+    """Run a read on a pooled connection; concurrent identical reads share it."""
+    with pooled_connection() as conn:
+        return read(conn, sql, params)
+
+
+class Query:
+    """
+    Fluent SELECT builder for one domain table.
+
+    Every method returns the query itself, so calls can be chained.
+    Nothing touches the database until fetch().
+    """
+
+    def __init__(self, table_name):
+        if table_name not in TABLE_COLUMNS:
+            raise ValueError(f"Unknown table: {table_name}")
+        self.table_name = table_name
+        self._columns = None
+        self._conditions = []
+        self._params = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    def _check(self, column):
+        if column not in TABLE_COLUMNS[self.table_name]:
+            raise ValueError(f"Unknown column '{column}' for table {self.table_name}")
+        return f'"{column}"'
+
+    @property
+    def columns(self):
+        """Projected columns, or None for all columns."""
+        return list(self._columns) if self._columns else None
+
+    def copy(self):
+        """Independent copy of this query, for building variants of it."""
+        return copy.deepcopy(self)
+
+    def select(self, *columns):
+        """Project only the given columns (default: all)."""
+        for column in columns:
+            self._check(column)
+        self._columns = list(columns) or None
+        return self
+
+    def where(self, **filters):
+        """
+        Add equality filters, combined with AND.
+        A list, tuple or set value becomes an IN filter.
+        """
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple, set, frozenset)):
+                self.where_in(column, value)
+            elif value is None:
+                self._conditions.append(f"{self._check(column)} IS NULL")
+            else:
+                self._conditions.append(f"{self._check(column)} = ?")
+                self._params.append(value)
+        return self
+
+    def where_in(self, column, values):
+        """Add a column IN (...) filter."""
+        name = self._check(column)
+        values = list(values)
+        if not values:
+            # Nothing can match an empty IN list
+            self._conditions.append("0")
+            return self
+        placeholders = ", ".join("?" for _ in values)
+        self._conditions.append(f"{name} IN ({placeholders})")
+        self._params.extend(values)
+        return self
+
+    def between(self, column, start=None, end=None):
+        """Add a range filter: start <= column < end (either bound optional)."""
+        name = self._check(column)
+        if start is not None:
+            self._conditions.append(f"{name} >= ?")
+            self._params.append(start)
+        if end is not None:
+            self._conditions.append(f"{name} < ?")
+            self._params.append(end)
+        return self
+
+    def order_by(self, column, descending=False):
+        """Add a sort key; call again for secondary keys."""
+        self._order.append(f"{self._check(column)} {'DESC' if descending else 'ASC'}")
+        return self
+
+    def clear_order(self):
+        """Drop every sort key added so far."""
+        self._order = []
+        return self
+
+    def limit(self, count, offset=None):
+        """Return at most `count` rows, optionally skipping `offset` first."""
+        self._limit = int(count)
+        self._offset = int(offset) if offset is not None else None
+        return self
+
+    def compile(self):
+        """
+        Build the SQL statement.
+
+        Returns:
+            tuple: (sql, params)
+        """
+        columns = ", ".join(f'"{c}"' for c in self._columns) if self._columns else "*"
+        sql = f"SELECT {columns} FROM {self.table_name}"
+        params = list(self._params)
+        if self._conditions:
+            sql += " WHERE " + " AND ".join(self._conditions)
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        if self._limit is not None:
+            sql += " LIMIT ?"
+            params.append(self._limit)
+            if self._offset is not None:
+                sql += " OFFSET ?"
+                params.append(self._offset)
+        return sql, tuple(params)
+
+    def count(self, conn=None):
+        """
+        Count the rows matching the filters (ignores projection, order and limit).
+
+        Returns:
+            int: Number of matching rows
+        """
+        sql = f"SELECT COUNT(*) FROM {self.table_name}"
+        if self._conditions:
+            sql += " WHERE " + " AND ".join(self._conditions)
+        return self._run(_read_scalar, sql, tuple(self._params), conn)
+
+    def fetch(self, conn=None):
+        """
+        Run the query.
+
+        Args:
+            conn: Database connection (default: borrow one from the pool,
+                sharing the result with identical concurrent reads)
+
+        Returns:
+            pandas.DataFrame: Matching rows
+        """
+        sql, params = self.compile()
+        return self._run(_read_frame, sql, params, conn)
+
+    def _run(self, read, sql, params, conn):
+        if conn is not None:
+            return read(conn, sql, params)
+        if current_snapshot() is not None:
+            # Stay on the snapshot's connection; other threads see other data
+            with pooled_connection() as conn:
+                return read(conn, sql, params)
+        result = _shared_read(read, sql, params, self.table_name)
+        # Every caller of a shared read gets its own frame to modify
+        return result.copy() if isinstance(result, pd.DataFrame) else result
+
+    def __repr__(self):
+        sql, params = self.compile()
+        return f"<Query {sql!r} {params!r}>"
@@ -0,0 +1,114 @@
+"""
+Query-plan checks for the data modules.
+
+Runs EXPLAIN QUERY PLAN on every read query in app/data and reports the
+ones SQLite would answer with a full table scan instead of an index.
+
+Run from the project root:
+    python -m app.data.query_plans
+"""
+import sqlite3
+import sys
+from . import incidents, tickets, datasets
+from .timestamps import to_epoch
+from .db import connect_database
+from .schema import create_all_tables
+
+# (label, sql, sample params, full scan allowed)
+# Full listings (ORDER BY id with no WHERE) read the whole table by design,
+# so a rowid scan is the expected plan for them.
+QUERIES = [
+    ("get_all_incidents", incidents.ALL_INCIDENTS_SQL, (), True),
+    ("get_incidents_by_severity", incidents.INCIDENTS_BY_SEVERITY_SQL, ("High",), False),
+    ("get_incidents_by_status", incidents.INCIDENTS_BY_STATUS_SQL, ("Open",), False),
+    ("get_incidents_by_type_count", incidents.INCIDENTS_BY_TYPE_COUNT_SQL, (), False),
+    ("get_high_severity_by_status", incidents.HIGH_SEVERITY_BY_STATUS_SQL, (), False),
+    ("get_incident_types_with_many_cases", incidents.INCIDENT_TYPES_WITH_MANY_CASES_SQL, (5,), False),
+    ("get_all_tickets", tickets.ALL_TICKETS_SQL, (), True),
+    ("get_tickets_by_status", tickets.TICKETS_BY_STATUS_SQL, ("Open",), False),
+    ("get_tickets_by_priority", tickets.TICKETS_BY_PRIORITY_SQL, ("High",), False),
+    ("get_all_datasets", datasets.ALL_DATASETS_SQL, (), True),
+    ("get_datasets_by_category", datasets.DATASETS_BY_CATEGORY_SQL, ("Security",), False),
+    ("get_datasets_by_source", datasets.DATASETS_BY_SOURCE_SQL, ("internal",), False),
+]
+
+# Representative query-builder shapes used by the dashboards
+_BUILDER_QUERIES = [
+    ("query_incidents severity+status",
+     incidents.query_incidents().where(severity=["High", "Critical"], status="Open")),
+    ("query_incidents timestamp range",
+     incidents.query_incidents().between("timestamp", "2024-01-01", "2024-07-01")
+     .order_by("timestamp", descending=True).limit(50)),
+    ("query_incidents category",
+     incidents.query_incidents().where(category="Phishing").select("id", "category")),
+    ("query_tickets status+priority",
+     tickets.query_tickets().where(status="Open", priority=["High", "Medium"])),
+    ("query_tickets created_at range",
+     tickets.query_tickets().between("created_at", "2024-01-01", "2024-02-01")),
+    # Same shapes as get_*_between
+    ("get_incidents_between",
+     incidents.query_incidents().between("timestamp_epoch", to_epoch("2024-01-01"), to_epoch("2024-07-01"))
+     .order_by("timestamp_epoch").order_by("id")),
+    ("get_tickets_between",
+     tickets.query_tickets().between("created_at_epoch", to_epoch("2024-01-01"), to_epoch("2024-02-01"))
+     .order_by("created_at_epoch").order_by("id")),
+    ("get_datasets_between",
+     datasets.query_datasets().between("upload_date_epoch", to_epoch("2024-01-01"), None)
+     .order_by("upload_date_epoch").order_by("id")),
+]
+QUERIES += [(label, *q.compile(), False) for label, q in _BUILDER_QUERIES]
+
+
+def explain(conn, sql, params=()):
+    """
+    Get the query plan for a statement.
+
+    Returns:
+        list: Plan detail strings, one per plan step
+    """
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+def is_table_scan(detail):
+    """True if a plan step reads a whole table rather than an index."""
+    return detail.startswith("SCAN ") and "USING" not in detail
+
+
+def check_query_plans(conn, queries=QUERIES):
+    """
+    EXPLAIN every query and collect the ones that fall back to a table scan.
+
+    Args:
+        conn: Database connection with the schema and indexes created
+        queries: (label, sql, params, allow_scan) tuples to check
+
+    Returns:
+        list: (label, plan) tuples for each failing query
+    """
+    failures = []
+    for label, sql, params, allow_scan in queries:
+        try:
+            plan = explain(conn, sql, params)
+        except sqlite3.Error as e:
+            failures.append((label, [f"error: {e}"]))
+            continue
+        if not allow_scan and any(is_table_scan(step) for step in plan):
+            failures.append((label, plan))
+    return failures
+
+
+def main():
+    conn = connect_database(":memory:")
+    create_all_tables(conn)
+    failures = check_query_plans(conn)
+    conn.close()
+
+    for label, plan in failures:
+        print(f"[FAIL] {label}: {'; '.join(plan)}")
+    print(f"{len(QUERIES) - len(failures)}/{len(QUERIES)} queries use an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
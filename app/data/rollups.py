@@ -0,0 +1,271 @@
+"""
+Materialized daily and hourly rollups for the trend charts.
+
+Counts are bucketed by (category, severity, status) for incidents and
+(priority, status) for tickets, and kept current by triggers on the base
+tables - every insert, update and delete path (single-row CRUD, batch APIs,
+CSV loads) maintains them without extra code. Trend queries read only the
+rollups, so their cost depends on the number of buckets, not rows.
+"""
+import pandas as pd
+from .db import pooled_connection
+from .cache import cached_query
+
+DAY = "day"
+HOUR = "hour"
+
+# strftime formats for each bucket size
+BUCKET_FORMATS = {
+    DAY: "%Y-%m-%d",
+    HOUR: "%Y-%m-%d %H:00:00",
+}
+
+# source table -> (rollup prefix, timestamp column, dimension columns)
+ROLLUPS = {
+    "cyber_incidents": ("incident_rollup", "timestamp", ("category", "severity", "status")),
+    "it_tickets": ("ticket_rollup", "created_at", ("priority", "status")),
+}
+
+
+def _rollup_table(source_table, bucket):
+    prefix = ROLLUPS[source_table][0]
+    return f"{prefix}_{'daily' if bucket == DAY else 'hourly'}"
+
+
+def _create_rollup_sql(source_table, bucket):
+    _, _, dimensions = ROLLUPS[source_table]
+    table = _rollup_table(source_table, bucket)
+    dimension_cols = "".join(f"        {d} TEXT NOT NULL,\n" for d in dimensions)
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        bucket TEXT NOT NULL,
+{dimension_cols}        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (bucket, {', '.join(dimensions)})
+    ) WITHOUT ROWID;
+    """
+
+
+def _trigger_statements(source_table, bucket, row, delta):
+    """
+    SQL run inside a trigger to add `delta` to the bucket of NEW/OLD `row`.
+    NULL dimensions are stored as '' (primary-key columns can't be NULL).
+    """
+    _, ts_column, dimensions = ROLLUPS[source_table]
+    table = _rollup_table(source_table, bucket)
+    bucket_expr = f"strftime('{BUCKET_FORMATS[bucket]}', {row}.{ts_column})"
+    values = [bucket_expr] + [f"COALESCE({row}.{d}, '')" for d in dimensions]
+    if delta > 0:
+        return (
+            f"INSERT INTO {table} (bucket, {', '.join(dimensions)}, count) "
+            f"SELECT {', '.join(values)}, 1 WHERE {bucket_expr} IS NOT NULL "
+            f"ON CONFLICT(bucket, {', '.join(dimensions)}) DO UPDATE SET count = count + 1;"
+        )
+    conditions = " AND ".join(
+        f"{col} = {val}" for col, val in zip(["bucket", *dimensions], values)
+    )
+    return f"UPDATE {table} SET count = count - 1 WHERE {conditions};"
+
+
+def _create_triggers(cursor, source_table):
+    _, ts_column, dimensions = ROLLUPS[source_table]
+    prefix = ROLLUPS[source_table][0]
+    watched = ", ".join([ts_column, *dimensions])
+
+    def body(*parts):
+        return "\n        ".join(parts)
+
+    insert_sql = [_trigger_statements(source_table, b, "NEW", +1) for b in BUCKET_FORMATS]
+    delete_sql = [_trigger_statements(source_table, b, "OLD", -1) for b in BUCKET_FORMATS]
+
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{prefix}_insert AFTER INSERT ON {source_table}
+    BEGIN
+        {body(*insert_sql)}
+    END;
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{prefix}_delete AFTER DELETE ON {source_table}
+    BEGIN
+        {body(*delete_sql)}
+    END;
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{prefix}_update AFTER UPDATE OF {watched} ON {source_table}
+    BEGIN
+        {body(*delete_sql, *insert_sql)}
+    END;
+    """)
+
+
+def rebuild_rollups(conn, source_table=None):
+    """
+    Recompute rollups from scratch from the base tables.
+
+    Only needed to backfill existing rows; afterwards the triggers keep the
+    rollups current.
+
+    Args:
+        conn: Database connection
+        source_table: Base table to rebuild (default: all)
+    """
+    cursor = conn.cursor()
+    for table in ([source_table] if source_table else ROLLUPS):
+        _, ts_column, dimensions = ROLLUPS[table]
+        dims = ", ".join(dimensions)
+        dim_values = ", ".join(f"COALESCE({d}, '')" for d in dimensions)
+        for bucket, fmt in BUCKET_FORMATS.items():
+            rollup = _rollup_table(table, bucket)
+            cursor.execute(f"DELETE FROM {rollup}")
+            cursor.execute(f"""
+                INSERT INTO {rollup} (bucket, {dims}, count)
+                SELECT strftime('{fmt}', {ts_column}) AS b, {dim_values}, COUNT(*)
+                FROM {table}
+                WHERE b IS NOT NULL
+                GROUP BY b, {dim_values}
+            """)
+    conn.commit()
+
+
+def create_rollup_tables(conn):
+    """
+    Create the rollup tables and their maintenance triggers if they don't
+    exist, backfilling any rollup that is created for the first time.
+
+    Args:
+        conn: Database connection object
+    """
+    cursor = conn.cursor()
+    for source_table in ROLLUPS:
+        created = False
+        for bucket in BUCKET_FORMATS:
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (_rollup_table(source_table, bucket),)
+            ).fetchone()
+            if not exists:
+                cursor.execute(_create_rollup_sql(source_table, bucket))
+                created = True
+        _create_triggers(cursor, source_table)
+        conn.commit()
+        if created:
+            rebuild_rollups(conn, source_table)
+    print(" Rollup tables created successfully!")
+
+
+def _to_bucket(value, bucket):
+    """Format a date/datetime/string bound the way bucket keys are stored."""
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime(BUCKET_FORMATS[bucket].replace(":00:00", ":%M:%S"))
+
+
+def _get_trend(source_table, start, end, bucket, by, filters, conn):
+    _, _, dimensions = ROLLUPS[source_table]
+    if bucket not in BUCKET_FORMATS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    if by is not None and by not in dimensions:
+        raise ValueError(f"Cannot group {source_table} trend by '{by}'")
+
+    select_by = f", {by}" if by else ""
+    sql = f"SELECT bucket{select_by}, SUM(count) AS count FROM {_rollup_table(source_table, bucket)}"
+    conditions, params = ["count > 0"], []
+    if start is not None:
+        conditions.append("bucket >= ?")
+        params.append(_to_bucket(start, bucket))
+    if end is not None:
+        conditions.append("bucket < ?")
+        params.append(_to_bucket(end, bucket))
+    for column, value in (filters or {}).items():
+        if column not in dimensions:
+            raise ValueError(f"Cannot filter {source_table} trend by '{column}'")
+        conditions.append(f"{column} = ?")
+        params.append(value)
+    sql += " WHERE " + " AND ".join(conditions)
+    sql += f" GROUP BY bucket{select_by} ORDER BY bucket"
+
+    if conn is not None:
+        rows = pd.read_sql_query(sql, conn, params=params)
+    else:
+        with pooled_connection() as conn:
+            rows = pd.read_sql_query(sql, conn, params=params)
+
+    rows["bucket"] = pd.to_datetime(rows["bucket"])
+    if by:
+        trend = rows.pivot(index="bucket", columns=by, values="count")
+    else:
+        trend = rows.set_index("bucket")[["count"]]
+
+    # Fill empty buckets with zero so charts show gaps as 0, not as a line
+    freq = "D" if bucket == DAY else "h"
+    first = pd.Timestamp(start) if start is not None else (trend.index.min() if len(trend) else None)
+    last = pd.Timestamp(end) - pd.Timedelta(1, freq) if end is not None else (trend.index.max() if len(trend) else None)
+    if first is not None and last is not None and first <= last:
+        full_range = pd.date_range(first.floor(freq), last.floor(freq), freq=freq, name="bucket")
+        trend = trend.reindex(full_range)
+    return trend.fillna(0).astype(int)
+
+
+@cached_query("cyber_incidents")
+def get_incident_trend(start=None, end=None, bucket=DAY, by=None, filters=None, conn=None):
+    """
+    Incident counts per time bucket, read from the rollup tables.
+
+    Args:
+        start: Inclusive lower bound (date, datetime or string), optional
+        end: Exclusive upper bound, optional
+        bucket: DAY or HOUR
+        by: Optional dimension to split into columns: category, severity or status
+        filters: Optional {dimension: value} equality filters
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        pandas.DataFrame: Indexed by bucket start; one 'count' column,
+            or one column per value of `by`
+    """
+    return _get_trend("cyber_incidents", start, end, bucket, by, filters, conn)
+
+
+@cached_query("it_tickets")
+def get_ticket_trend(start=None, end=None, bucket=DAY, by=None, filters=None, conn=None):
+    """
+    Ticket counts per time bucket, read from the rollup tables.
+
+    Args:
+        start: Inclusive lower bound (date, datetime or string), optional
+        end: Exclusive upper bound, optional
+        bucket: DAY or HOUR
+        by: Optional dimension to split into columns: priority or status
+        filters: Optional {dimension: value} equality filters
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        pandas.DataFrame: Indexed by bucket start; one 'count' column,
+            or one column per value of `by`
+    """
+    return _get_trend("it_tickets", start, end, bucket, by, filters, conn)
+
+
+def add_to_trend(trend, timestamps, bucket=DAY):
+    """
+    Count new rows into a trend frame without re-reading the rollups.
+
+    For patching a get_*_trend() result (no `by`) with rows a change feed
+    reports as inserted; updates and deletes need a re-read, since their
+    old bucket isn't known.
+
+    Args:
+        trend: DataFrame with a 'count' column, indexed by bucket start
+        timestamps: Timestamp values of the inserted rows
+        bucket: DAY or HOUR, matching the trend
+
+    Returns:
+        pandas.DataFrame: Updated trend, with any new buckets zero-filled
+    """
+    freq = "D" if bucket == DAY else "h"
+    buckets = pd.to_datetime(pd.Series(timestamps, dtype=object), format="mixed", errors="coerce")
+    added = buckets.dropna().dt.floor(freq).value_counts().rename("count").to_frame()
+    if added.empty:
+        return trend
+    updated = trend.add(added, fill_value=0)
+    full_range = pd.date_range(updated.index.min(), updated.index.max(), freq=freq, name=trend.index.name)
+    return updated.reindex(full_range).fillna(0).astype(int)
@@ -1,179 +1,237 @@
 from pathlib import Path
-import pandas as pd
 from .db import connect_database
 
 DATA_DIR = Path("DATA")
 
-#might hv to change the fields
-def create_users_table(conn):
-    """
-    Create the users table if it doesn't exist.
-    
-    Args:
-        conn: Database connection object
-    """
-    create_table_sql = """
+# Canonical shape of every table, shared by the create_* helpers below and
+# the table rebuilds in app.data.migrations.
+# Natural keys are INTEGER (compact, and compare numerically), timestamps
+# keep their TEXT form next to an indexed INTEGER epoch (see app.data.timestamps).
+TABLE_DEFINITIONS = {
+    "users": """
     CREATE TABLE IF NOT EXISTS users (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         username TEXT NOT NULL UNIQUE,
         password_hash TEXT NOT NULL,
-        role TEXT DEFAULT 'user'
+        role TEXT DEFAULT 'user',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
     );
-    """
-    
-    cursor = conn.cursor()
-    cursor.execute(create_table_sql)
-    conn.commit()
-    print(" Users table created successfully!")
-
-def create_cyber_incidents_table(conn):
-    """Create the cyber_incidents table if it doesn't exist."""
-    create_table_sql = """
+    """,
+    "cyber_incidents": """
     CREATE TABLE IF NOT EXISTS cyber_incidents (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
-        incident_id TEXT,
+        incident_id INTEGER,
         timestamp TEXT NOT NULL,
+        timestamp_epoch INTEGER,
         category TEXT,
         severity TEXT NOT NULL,
         status TEXT NOT NULL,
         description TEXT,
         reported_by TEXT
     );
-    """
-    
-    cursor = conn.cursor()
-    cursor.execute(create_table_sql)
-    conn.commit()
-    print(" Cyber Incidents table created successfully!")
-
-def create_datasets_metadata_table(conn):
-    """Create the datasets_metadata table if it doesn't exist."""
-    create_table_sql = """
+    """,
+    "datasets_metadata": """
     CREATE TABLE IF NOT EXISTS datasets_metadata (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
-        dataset_id TEXT,
+        dataset_id INTEGER,
         name TEXT NOT NULL,
+        category TEXT,
+        source TEXT,
         rows INTEGER,
         columns INTEGER,
+        file_size_mb REAL,
         uploaded_by TEXT,
         upload_date TEXT,
+        upload_date_epoch INTEGER,
         description TEXT
     );
+    """,
+    "it_tickets": """
+    CREATE TABLE IF NOT EXISTS it_tickets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticket_id INTEGER,
+        priority TEXT,
+        status TEXT NOT NULL,
+        category TEXT,
+        subject TEXT,
+        description TEXT,
+        assigned_to TEXT,
+        created_at TEXT,
+        created_at_epoch INTEGER,
+        resolved_at TEXT,
+        resolution_time_hours INTEGER
+    );
+    """,
+}
+
+def create_users_table(conn):
     """
+    Create the users table if it doesn't exist.
     
+    Args:
+        conn: Database connection object
+    """
     cursor = conn.cursor()
-    cursor.execute(create_table_sql)
+    cursor.execute(TABLE_DEFINITIONS["users"])
+    conn.commit()
+    print(" Users table created successfully!")
+
+def create_cyber_incidents_table(conn):
+    """Create the cyber_incidents table if it doesn't exist."""
+    cursor = conn.cursor()
+    cursor.execute(TABLE_DEFINITIONS["cyber_incidents"])
+    conn.commit()
+    print(" Cyber Incidents table created successfully!")
+
+def create_datasets_metadata_table(conn):
+    """Create the datasets_metadata table if it doesn't exist."""
+    cursor = conn.cursor()
+    cursor.execute(TABLE_DEFINITIONS["datasets_metadata"])
     conn.commit()
     print(" Datasets Metadata table created successfully!")
 
 def create_it_tickets_table(conn):
     """Create the it_tickets table if it doesn't exist."""
+    cursor = conn.cursor()
+    cursor.execute(TABLE_DEFINITIONS["it_tickets"])
+    conn.commit()
+    print(" IT Tickets table created successfully!")
+
+# Managed secondary indexes: (name, table, columns).
+# Column order matters - equality filters first, then GROUP BY / ORDER BY columns,
+# so the index also covers the aggregate queries without touching the table.
+INDEXES = [
+    # get_high_severity_by_status: WHERE severity = ? GROUP BY status (covering)
+    ("idx_incidents_severity_status", "cyber_incidents", ("severity", "status")),
+    ("idx_incidents_status", "cyber_incidents", ("status",)),
+    # get_incidents_by_type_count: GROUP BY category (covering)
+    ("idx_incidents_category", "cyber_incidents", ("category",)),
+    ("idx_incidents_timestamp", "cyber_incidents", ("timestamp",)),
+    ("idx_tickets_status_priority", "it_tickets", ("status", "priority")),
+    ("idx_tickets_priority", "it_tickets", ("priority",)),
+    ("idx_tickets_created_at", "it_tickets", ("created_at",)),
+    ("idx_datasets_upload_date", "datasets_metadata", ("upload_date",)),
+    ("idx_datasets_category", "datasets_metadata", ("category",)),
+    ("idx_datasets_source", "datasets_metadata", ("source",)),
+    # Time-window range scans (see app.data.timestamps)
+    ("idx_incidents_timestamp_epoch", "cyber_incidents", ("timestamp_epoch",)),
+    ("idx_tickets_created_at_epoch", "it_tickets", ("created_at_epoch",)),
+    ("idx_datasets_upload_date_epoch", "datasets_metadata", ("upload_date_epoch",)),
+]
+
+def create_indexes(conn):
+    """
+    Create every index in INDEXES if it doesn't exist, then refresh
+    the planner statistics so SQLite picks them.
+
+    Args:
+        conn: Database connection object
+    """
+    cursor = conn.cursor()
+    for index_name, table_name, columns in INDEXES:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} "
+            f"ON {table_name} ({', '.join(columns)})"
+        )
+    cursor.execute("ANALYZE")
+    conn.commit()
+    print(f" {len(INDEXES)} indexes ensured successfully!")
+
+# Natural key of each domain table - CSV rows are upserted on these
+NATURAL_KEYS = {
+    "cyber_incidents": "incident_id",
+    "it_tickets": "ticket_id",
+    "datasets_metadata": "dataset_id",
+}
+
+def create_natural_key_indexes(conn):
+    """
+    Create a UNIQUE index on each table's natural key so loads can upsert.
+
+    Older databases were loaded with plain appends and may hold duplicates;
+    those are collapsed to the first copy before the index is built.
+
+    Args:
+        conn: Database connection object
+    """
+    cursor = conn.cursor()
+    for table_name, key in NATURAL_KEYS.items():
+        index_name = f"uq_{table_name}_{key}"
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+            (index_name,)
+        ).fetchone()
+        if exists:
+            continue
+        cursor.execute(f"""
+            DELETE FROM {table_name}
+            WHERE {key} IS NOT NULL
+              AND id NOT IN (
+                  SELECT MIN(id) FROM {table_name}
+                  WHERE {key} IS NOT NULL
+                  GROUP BY {key}
+              )
+        """)
+        if cursor.rowcount > 0:
+            print(f" Removed {cursor.rowcount} duplicate rows from {table_name}")
+        cursor.execute(f"CREATE UNIQUE INDEX {index_name} ON {table_name} ({key})")
+    conn.commit()
+
+def create_ingest_ledger_table(conn):
+    """Create the ingest_ledger table if it doesn't exist."""
     create_table_sql = """
-    CREATE TABLE IF NOT EXISTS it_tickets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        ticket_id TEXT,
-        priority TEXT,
-        description TEXT,
-        status TEXT NOT NULL,
-        assigned_to TEXT,
-        created_at TEXT,
-        resolution_time_hours INTEGER
+    CREATE TABLE IF NOT EXISTS ingest_ledger (
+        source_path TEXT PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        content_hash TEXT NOT NULL,
+        byte_offset INTEGER NOT NULL,
+        row_offset INTEGER NOT NULL,
+        ingested_at TEXT NOT NULL
     );
     """
-    
+
     cursor = conn.cursor()
     cursor.execute(create_table_sql)
     conn.commit()
-    print(" IT Tickets table created successfully!")
+    print(" Ingest Ledger table created successfully!")
+
+def create_login_throttle_table(conn):
+    """Create the login_throttle table if it doesn't exist."""
+    create_table_sql = """
+    CREATE TABLE IF NOT EXISTS login_throttle (
+        bucket_key TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    """
+
+    cursor = conn.cursor()
+    cursor.execute(create_table_sql)
+    conn.commit()
+    print(" Login Throttle table created successfully!")
 
 def create_all_tables(conn):
-    """Create all tables."""
-    create_users_table(conn)
-    create_cyber_incidents_table(conn)
-    create_datasets_metadata_table(conn)
-    create_it_tickets_table(conn)
+    """
+    Bring the database up to the current schema version.
+    Kept for backwards compatibility - see app.data.migrations.migrate.
+    """
+    from .migrations import migrate
+    return migrate(conn)
 
-def load_csv_to_table(conn, csv_path, table_name):
+def load_csv_to_table(conn, csv_path, table_name, **kwargs):
     """
-    Load a CSV file into a database table using pandas.
-    
-    Args:
-        conn: Database connection
-        csv_path: Path to CSV file
-        table_name: Name of the database table
-        
-    Returns:
-        int: Number of rows loaded
+    Load a CSV file into a database table.
+    Kept for backwards compatibility - see app.data.loader.load_csv_to_table.
     """
-    path = Path(csv_path)
-    
-    # Check if file exists
-    if not path.exists():
-        print(f" Warning: {csv_path} not found. Skipping.")
-        return 0
-    
-    # Read CSV into DataFrame
-    df = pd.read_csv(path)
-    
-    # Clean column names (remove extra whitespace)
-    df.columns = df.columns.str.strip()
-    
-    # Map CSV columns to database columns for cyber_incidents
-    if table_name == 'cyber_incidents':
-        column_mapping = {
-            'incident_id': 'incident_id',
-            'timestamp': 'timestamp',
-            'category': 'category',
-            'severity': 'severity',
-            'status': 'status',
-            'description': 'description'
-        }
-        # Only rename columns that exist and need renaming
-        available_cols = df.columns.tolist()
-        df = df.rename(columns={k: v for k, v in column_mapping.items() if k in available_cols})
-    
-    # Preview data
-    print(f"\n Loading {csv_path}...")
-    print(f"   Columns: {list(df.columns)}")
-    print(f"   Rows: {len(df)}")
-    
-    
-    
-    # Load into database
-    df.to_sql(table_name, conn, if_exists='append', index=False)
-    
-    print(f"    Loaded {len(df)} rows into '{table_name}' table.")
-    return len(df)
+    from .loader import load_csv_to_table as _load_csv_to_table
+    return _load_csv_to_table(conn, csv_path, table_name, **kwargs)
 
-def load_all_csv_data(conn):
+def load_all_csv_data(conn, **kwargs):
     """
     Load all three domain CSV files into the database.
+    Kept for backwards compatibility - see app.data.loader.load_all_csv_data.
     """
-    print("\n Starting CSV data loading...")
-    
-    total_rows = 0
-    
-    # Load cyber incidents
-    total_rows += load_csv_to_table(
-        conn,
-        DATA_DIR / "cyber_incidents.csv",
-        "cyber_incidents"
-    )
-    
-    # Load datasets metadata
-    total_rows += load_csv_to_table(
-        conn,
-        DATA_DIR / "datasets_metadata.csv",
-        "datasets_metadata"
-    )
-    
-    # Load IT tickets
-    total_rows += load_csv_to_table(
-        conn,
-        DATA_DIR / "it_tickets.csv",
-        "it_tickets"
-    )
-    
-    print(f"\nTotal rows loaded: {total_rows}")
-    return total_rows
-
+    from .loader import load_all_csv_data as _load_all_csv_data
+    return _load_all_csv_data(conn, **kwargs)
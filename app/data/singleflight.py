@@ -0,0 +1,105 @@
+"""
+Single-flight request coalescing.
+
+When several sessions ask for the same thing at the same moment (everyone
+opening the dashboard at shift change), only the first caller runs the
+query; the others wait for it and share its result. Keys include the table
+versions (see app.data.cache), so a call that starts after a write never
+joins a flight that read the old data.
+"""
+import functools
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Call func(*args, **kwargs), or join an identical call already running.
+
+        Args:
+            key: Hashable identity of the call
+            func: Function to run if no call for `key` is in flight
+
+        Returns:
+            Whatever func returned; exceptions are re-raised in every caller
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Future()
+                self._flights[key] = flight
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return flight.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def stats(self):
+        """How many calls ran and how many piggybacked on another caller."""
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "shared": self.shared,
+                "in_flight": len(self._flights),
+            }
+
+
+_flights = SingleFlight()
+
+
+def get_flights():
+    """The process-wide SingleFlight group used by the data modules."""
+    return _flights
+
+
+def single_flight(key_func=None):
+    """
+    Decorator: coalesce concurrent calls with the same arguments.
+
+    Use for reads that shouldn't be cached but are still worth de-duplicating.
+    Callers get the same object back, so don't mutate shared results.
+
+    Args:
+        key_func: Optional callable(*args, **kwargs) -> hashable key
+            (default: the function name plus its arguments)
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                if key_func is not None:
+                    key = (name, key_func(*args, **kwargs))
+                else:
+                    key = (name, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            return _flights.do(key, func, *args, **kwargs)
+
+        return wrapper
+    return decorator
@@ -1,5 +1,15 @@
 import pandas as pd
-from app.data.db import connect_database
+from app.data.db import pooled_connection
+from app.data.batch import as_rows, batch_insert, batch_update_column, batch_delete
+from app.data.query import Query
+from app.data.pagination import fetch_page, NEXT, DEFAULT_PAGE_SIZE
+from app.data.cache import cached_query, bump_table_version
+from app.data.timestamps import to_epoch
+
+# Read queries, kept at module level so app.data.query_plans can EXPLAIN them.
+ALL_TICKETS_SQL = "SELECT * FROM it_tickets ORDER BY id DESC"
+TICKETS_BY_STATUS_SQL = "SELECT * FROM it_tickets WHERE status = ? ORDER BY id DESC"
+TICKETS_BY_PRIORITY_SQL = "SELECT * FROM it_tickets WHERE priority = ? ORDER BY id DESC"
 
 
 def insert_ticket(priority, status, category, subject, description, created_date, resolved_date=None, assigned_to=None):
@@ -19,38 +29,113 @@ def insert_ticket(priority, status, category, subject, description, created_date
     Returns:
         int: ID of the newly inserted ticket
     """
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO it_tickets 
-        (priority, status, category, subject, description, created_date, resolved_date, assigned_to)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (priority, status, category, subject, description, created_date, resolved_date, assigned_to))
-    conn.commit()
-    ticket_id = cursor.lastrowid
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO it_tickets 
+            (priority, status, category, subject, description, created_at, resolved_at, assigned_to)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (priority, status, category, subject, description, created_date, resolved_date, assigned_to))
+        ticket_id = cursor.lastrowid
+    bump_table_version("it_tickets")
     return ticket_id
 
 
+TICKET_FIELDS = ("priority", "status", "category", "subject", "description",
+                 "created_date", "resolved_date", "assigned_to")
+TICKET_COLUMNS = ("priority", "status", "category", "subject", "description",
+                  "created_at", "resolved_at", "assigned_to")
+
+def insert_tickets(records):
+    """
+    Insert many IT tickets in a single transaction.
+
+    Args:
+        records: Iterable of dicts keyed like insert_ticket's arguments
+            (priority, status, category, subject, description, created_date,
+            resolved_date, assigned_to) or tuples in that order
+
+    Returns:
+        list: IDs of the new tickets, in input order
+    """
+    rows = as_rows(records, TICKET_FIELDS)
+    with pooled_connection() as conn:
+        return batch_insert(conn, "it_tickets", TICKET_COLUMNS, rows)
+
+
+@cached_query("it_tickets")
 def get_all_tickets():
     """Get all tickets as DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query("SELECT * FROM it_tickets ORDER BY id DESC", conn)
-    conn.close()
+    with pooled_connection() as conn:
+        df = pd.read_sql_query(ALL_TICKETS_SQL, conn)
     return df
 
 
+def query_tickets():
+    """
+    Start a composable query over it_tickets.
+
+    Example:
+        query_tickets().where(status="Open", priority=["High", "Medium"]) \
+            .order_by("created_at").fetch(conn)
+
+    Returns:
+        Query: Builder for it_tickets
+    """
+    return Query("it_tickets")
+
+
+@cached_query("it_tickets")
+def get_tickets_page(cursor=None, direction=NEXT, page_size=DEFAULT_PAGE_SIZE, query=None, conn=None):
+    """
+    Get one keyset-paginated page of tickets, newest first.
+
+    Args:
+        cursor: id at the edge of the current page (None = newest page)
+        direction: pagination.NEXT (older) or pagination.PREV (newer)
+        page_size: Rows per page
+        query: Optional query_tickets() builder with filters to apply
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        tuple: (page DataFrame, next_cursor or None)
+    """
+    return fetch_page("it_tickets", cursor, direction, page_size, query, conn)
+
+
+@cached_query("it_tickets")
+def get_tickets_between(start=None, end=None, query=None, conn=None):
+    """
+    Get tickets whose created_at falls in [start, end), oldest first.
+
+    Filters on the indexed created_at_epoch column, so this is an index range scan.
+
+    Args:
+        start: Inclusive lower bound (date, datetime or string), optional
+        end: Exclusive upper bound, optional
+        query: Optional query_tickets() builder with extra filters
+        conn: Database connection (default: borrow one from the pool)
+
+    Returns:
+        pandas.DataFrame: Matching tickets
+    """
+    query = query.copy() if query is not None else query_tickets()
+    return (query.between("created_at_epoch", to_epoch(start), to_epoch(end))
+            .clear_order().order_by("created_at_epoch").order_by("id")
+            .fetch(conn))
+
+
+@cached_query("it_tickets")
 def get_tickets_by_status(conn, status):
     """Get tickets by status."""
-    query = "SELECT * FROM it_tickets WHERE status = ? ORDER BY id DESC"
-    df = pd.read_sql_query(query, conn, params=(status,))
+    df = pd.read_sql_query(TICKETS_BY_STATUS_SQL, conn, params=(status,))
     return df
 
 
+@cached_query("it_tickets")
 def get_tickets_by_priority(conn, priority):
     """Get tickets by priority."""
-    query = "SELECT * FROM it_tickets WHERE priority = ? ORDER BY id DESC"
-    df = pd.read_sql_query(query, conn, params=(priority,))
+    df = pd.read_sql_query(TICKETS_BY_PRIORITY_SQL, conn, params=(priority,))
     return df
 
 
@@ -72,6 +157,7 @@ def update_ticket_status(conn, ticket_id, new_status):
         (new_status, ticket_id)
     )
     conn.commit()
+    bump_table_version("it_tickets")
     rows_affected = cursor.rowcount
     
     if rows_affected > 0:
@@ -96,6 +182,7 @@ def delete_ticket(conn, ticket_id):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM it_tickets WHERE id = ?", (ticket_id,))
     conn.commit()
+    bump_table_version("it_tickets")
     rows_affected = cursor.rowcount
     
     if rows_affected > 0:
@@ -106,6 +193,35 @@ def delete_ticket(conn, ticket_id):
         return False
 
 
+def update_ticket_statuses(conn, updates):
+    """
+    Update the status of many tickets in a single transaction.
+
+    Args:
+        conn: Database connection
+        updates: Mapping of {ticket_id: new_status} or iterable of
+            (ticket_id, new_status) pairs
+
+    Returns:
+        dict: requested, updated and missing ticket IDs
+    """
+    return batch_update_column(conn, "it_tickets", "status", updates)
+
+
+def delete_tickets(conn, ticket_ids):
+    """
+    Delete many tickets in a single transaction.
+
+    Args:
+        conn: Database connection
+        ticket_ids: Iterable of ticket IDs
+
+    Returns:
+        dict: requested, deleted and missing ticket IDs
+    """
+    return batch_delete(conn, "it_tickets", ticket_ids)
+
+
 def load_tickets_from_csv(csv_path):
     """Load tickets from CSV file into database."""
     from pathlib import Path
@@ -116,7 +232,6 @@ def load_tickets_from_csv(csv_path):
         return 0
     
     try:
-        conn = connect_database()
         df = pd.read_csv(csv_path)
         
         # Clean column names
@@ -127,8 +242,9 @@ def load_tickets_from_csv(csv_path):
         print(f"  Rows: {len(df)}")
         
         # Load into database
-        df.to_sql('it_tickets', conn, if_exists='append', index=False)
-        conn.close()
+        with pooled_connection() as conn:
+            df.to_sql('it_tickets', conn, if_exists='append', index=False)
+        bump_table_version("it_tickets")
         
         print(f"  ✓ Loaded {len(df)} tickets")
         return len(df)
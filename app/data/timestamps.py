@@ -0,0 +1,111 @@
+"""
+Integer epoch columns shadowing the free-form TEXT timestamps.
+
+Each domain table keeps its original timestamp text and gains an indexed
+INTEGER column holding the same instant as Unix seconds (naive timestamps
+are treated as UTC). Time-window filters compare integers over an index
+range instead of parsing strings row by row.
+
+The loader fills the epoch column with one vectorized pd.to_datetime per
+chunk; triggers fill it for every other write path (single-row inserts,
+to_sql loads, status updates that touch the timestamp).
+"""
+import pandas as pd
+
+# table -> (TEXT timestamp column, INTEGER epoch column)
+EPOCH_COLUMNS = {
+    "cyber_incidents": ("timestamp", "timestamp_epoch"),
+    "it_tickets": ("created_at", "created_at_epoch"),
+    "datasets_metadata": ("upload_date", "upload_date_epoch"),
+}
+
+_EPOCH = pd.Timestamp("1970-01-01")
+_SECOND = pd.Timedelta(seconds=1)
+
+
+def to_epoch(value):
+    """
+    Convert a date, datetime, pandas Timestamp or string to Unix seconds.
+
+    Returns:
+        int or None: Seconds since 1970-01-01 UTC, None for None
+    """
+    if value is None:
+        return None
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return int((timestamp - _EPOCH) // _SECOND)
+
+
+def to_epoch_series(values):
+    """
+    Vectorized to_epoch for a column of timestamp strings.
+
+    Unparseable or missing values become None (stored as NULL).
+    """
+    parsed = pd.to_datetime(values, format="mixed", errors="coerce")
+    seconds = (parsed - _EPOCH) // _SECOND
+    return seconds.astype("Int64").astype(object).where(parsed.notna(), None)
+
+
+def add_epoch_column(df, table_name):
+    """
+    Add the table's epoch column to a DataFrame chunk, if it has the
+    timestamp column it derives from.
+    """
+    if table_name not in EPOCH_COLUMNS:
+        return df
+    text_column, epoch_column = EPOCH_COLUMNS[table_name]
+    if text_column in df.columns:
+        df = df.assign(**{epoch_column: to_epoch_series(df[text_column])})
+    return df
+
+
+def _epoch_expr(row, text_column):
+    return f"CAST(strftime('%s', {row}.{text_column}) AS INTEGER)"
+
+
+def create_epoch_columns(conn):
+    """
+    Add the epoch columns and their maintenance triggers if missing,
+    backfilling existing rows.
+
+    Args:
+        conn: Database connection object
+    """
+    cursor = conn.cursor()
+    for table_name, (text_column, epoch_column) in EPOCH_COLUMNS.items():
+        existing = [row[1] for row in cursor.execute(f"PRAGMA table_info({table_name})")]
+        if epoch_column not in existing:
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {epoch_column} INTEGER")
+        cursor.execute(f"""
+            UPDATE {table_name}
+            SET {epoch_column} = CAST(strftime('%s', {text_column}) AS INTEGER)
+            WHERE {epoch_column} IS NULL AND {text_column} IS NOT NULL
+        """)
+        if cursor.rowcount > 0:
+            print(f" Backfilled {cursor.rowcount} {table_name}.{epoch_column} values")
+
+        # Writers that don't supply the epoch get it computed by SQLite
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_epoch_insert
+        AFTER INSERT ON {table_name}
+        WHEN NEW.{epoch_column} IS NULL AND NEW.{text_column} IS NOT NULL
+        BEGIN
+            UPDATE {table_name} SET {epoch_column} = {_epoch_expr("NEW", text_column)}
+            WHERE id = NEW.id;
+        END;
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_epoch_update
+        AFTER UPDATE OF {text_column} ON {table_name}
+        WHEN NEW.{text_column} IS NOT OLD.{text_column}
+         AND NEW.{epoch_column} IS OLD.{epoch_column}
+        BEGIN
+            UPDATE {table_name} SET {epoch_column} = {_epoch_expr("NEW", text_column)}
+            WHERE id = NEW.id;
+        END;
+        """)
+    conn.commit()
+    print(" Epoch timestamp columns ensured successfully!")
@@ -1,23 +1,52 @@
-from .db import connect_database
+from .db import DB_PATH, pooled_connection
 def get_user_by_username(username):
     """Retrieve user by username."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT * FROM users WHERE username = ?",
-        (username,)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM users WHERE username = ?",
+            (username,)
+        )
+        user = cursor.fetchone()
     return user
+def update_password_hash(username, new_hash, old_hash, db_path=DB_PATH):
+    """
+    Replace a user's stored password hash (e.g. after a cost upgrade).
+
+    Only applies if the stored hash is still old_hash, so an upgrade
+    computed in the background never overwrites a password changed
+    in the meantime.
+
+    Returns:
+        bool: True if the hash was replaced
+    """
+    with pooled_connection(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?",
+            (new_hash, username, old_hash)
+        )
+    return cursor.rowcount > 0
 def insert_user(username, password_hash, role='user'):
     """Insert new user."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            (username, password_hash, role)
+        )
+def get_all_usernames(conn):
+    """All registered usernames, as a set (one query)."""
+    return {row[0] for row in conn.execute("SELECT username FROM users")}
+def insert_users(conn, rows):
+    """
+    Insert many users with executemany. The caller commits.
+
+    Args:
+        conn: Database connection
+        rows: Iterable of (username, password_hash, role) tuples
+    """
+    conn.executemany(
         "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role)
+        rows
     )
-    conn.commit()
-    conn.close()
-
@@ -0,0 +1,232 @@
+"""
+Group-commit write queue for interactive inserts and status updates.
+
+Form submissions put their write on a queue and get a Future back. A single
+background thread collects whatever arrives within a short window and runs
+the whole group in one transaction, so N concurrent submissions cost one
+commit instead of N and never contend for SQLite's writer lock.
+
+Usage:
+    future = insert_incident_async("2024-11-05", "Phishing", "High", "Open", "...")
+    incident_id = future.result()
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from .db import DB_PATH, pooled_connection
+from .cache import bump_table_version
+
+DEFAULT_WINDOW_MS = 5
+DEFAULT_MAX_BATCH = 256
+
+# What a resolved Future holds for each kind of write
+RESULT_LASTROWID = "lastrowid"
+RESULT_ROWCOUNT = "rowcount"
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    Background writer that coalesces queued statements into group commits.
+
+    Each statement runs inside its own SAVEPOINT, so a failing write only
+    fails its own Future and the rest of the group still commits.
+    """
+
+    def __init__(self, db_path=DB_PATH, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH):
+        self.db_path = db_path
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.writes = 0
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql, params=(), result=RESULT_LASTROWID, table_name=None):
+        """
+        Queue one write statement.
+
+        Args:
+            sql: INSERT/UPDATE/DELETE statement
+            params: Statement parameters
+            result: RESULT_LASTROWID to resolve with the new row id,
+                RESULT_ROWCOUNT to resolve with the number of rows changed
+            table_name: Table the statement writes, so cached reads of it
+                are invalidated once the group commits
+
+        Returns:
+            concurrent.futures.Future: Resolves once the group has committed
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+            self._queue.put((sql, params, result, table_name, future))
+        return future
+
+    def _collect(self, first):
+        """Gather writes that arrive within the window after the first one."""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Put the sentinel back so the loop stops after this group
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _commit_group(self, batch):
+        """Run one group in a single transaction and resolve its futures."""
+        outcomes = []
+        try:
+            with pooled_connection(self.db_path) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for sql, params, result, _, future in batch:
+                    conn.execute("SAVEPOINT queued_write")
+                    try:
+                        cursor = conn.execute(sql, params)
+                    except sqlite3.Error as e:
+                        conn.execute("ROLLBACK TO queued_write")
+                        conn.execute("RELEASE queued_write")
+                        outcomes.append((future, None, e))
+                        continue
+                    conn.execute("RELEASE queued_write")
+                    value = cursor.lastrowid if result == RESULT_LASTROWID else cursor.rowcount
+                    outcomes.append((future, value, None))
+                # pooled_connection commits here
+        except Exception as e:
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+
+        bump_table_version(*{item[3] for item in batch if item[3]})
+        self.commits += 1
+        self.writes += len(batch)
+        for future, value, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            self._commit_group(self._collect(first))
+
+    def close(self, timeout=None):
+        """Flush pending writes and stop the background thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Get the process-wide GroupCommitWriter, starting it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = GroupCommitWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+def insert_incident_async(date, incident_type, severity, status, description, reported_by=None):
+    """
+    Queue a new incident for the next group commit.
+
+    Returns:
+        Future: Resolves to the new incident's ID
+    """
+    return get_writer().submit("""
+        INSERT INTO cyber_incidents
+        (timestamp, category, severity, status, description, reported_by)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (date, incident_type, severity, status, description, reported_by),
+        table_name="cyber_incidents")
+
+
+def update_incident_status_async(incident_id, new_status):
+    """
+    Queue an incident status change for the next group commit.
+
+    Returns:
+        Future: Resolves to True if the incident existed
+    """
+    future = get_writer().submit(
+        "UPDATE cyber_incidents SET status = ? WHERE id = ?",
+        (new_status, incident_id),
+        result=RESULT_ROWCOUNT,
+        table_name="cyber_incidents"
+    )
+    return _as_bool(future)
+
+
+def insert_ticket_async(priority, status, category, subject, description, created_date,
+                        resolved_date=None, assigned_to=None):
+    """
+    Queue a new IT ticket for the next group commit.
+
+    Returns:
+        Future: Resolves to the new ticket's ID
+    """
+    return get_writer().submit("""
+        INSERT INTO it_tickets
+        (priority, status, category, subject, description, created_at, resolved_at, assigned_to)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (priority, status, category, subject, description, created_date, resolved_date, assigned_to),
+        table_name="it_tickets")
+
+
+def update_ticket_status_async(ticket_id, new_status):
+    """
+    Queue a ticket status change for the next group commit.
+
+    Returns:
+        Future: Resolves to True if the ticket existed
+    """
+    future = get_writer().submit(
+        "UPDATE it_tickets SET status = ? WHERE id = ?",
+        (new_status, ticket_id),
+        result=RESULT_ROWCOUNT,
+        table_name="it_tickets"
+    )
+    return _as_bool(future)
+
+
+def _as_bool(future):
+    """Chain a rowcount Future into one that resolves to rowcount > 0."""
+    result = Future()
+
+    def _done(f):
+        error = f.exception()
+        if error is not None:
+            result.set_exception(error)
+        else:
+            result.set_result(f.result() > 0)
+
+    future.add_done_callback(_done)
+    return result
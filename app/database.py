@@ -1,8 +1,11 @@
 import sqlite3
-import bcrypt
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+from app.data.cache import bump_table_version
+from app.data.migrations import migrate
+from app.data.users import update_password_hash
+from app.services.password_hashing import get_hasher, rehash_if_needed
 
 class DatabaseManager:
     def __init__(self, db_path):
@@ -14,59 +17,12 @@ class DatabaseManager:
         return sqlite3.connect(str(self.db_path))
     
     def ensure_tables(self):
-        """Ensure all required tables exist."""
+        """Ensure all required tables exist (see app.data.migrations)."""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                password_hash TEXT NOT NULL,
-                role TEXT DEFAULT 'user',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Cyber incidents table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cyber_incidents (
-                incident_id INTEGER PRIMARY KEY,
-                timestamp TEXT,
-                severity TEXT,
-                category TEXT,
-                status TEXT,
-                description TEXT
-            )
-        ''')
-        
-        # Datasets metadata table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS datasets_metadata (
-                dataset_id TEXT PRIMARY KEY,
-                name TEXT,
-                category TEXT,
-                num_records INTEGER,
-                last_updated TEXT
-            )
-        ''')
-        
-        # IT tickets table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS it_tickets (
-                ticket_id INTEGER PRIMARY KEY,
-                priority TEXT,
-                description TEXT,
-                status TEXT,
-                assigned_to TEXT,
-                created_at TEXT,
-                resolution_time_hours INTEGER
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        try:
+            migrate(conn)
+        finally:
+            conn.close()
     
     def verify_user(self, username, password):
         """Verify user credentials."""
@@ -83,7 +39,10 @@ class DatabaseManager:
         if result:
             user_id, username, stored_hash, role = result
             # Verify password against bcrypt hash
-            if bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
+            if get_hasher().check_password(password, stored_hash):
+                rehash_if_needed(password, stored_hash,
+                                 lambda new_hash: update_password_hash(username, new_hash, stored_hash,
+                                                                      self.db_path))
                 return {
                     'id': user_id,
                     'username': username,
@@ -107,7 +66,7 @@ class DatabaseManager:
         """Register new user with bcrypt password hashing."""
         try:
             # Hash password
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            password_hash = get_hasher().hash_password(password)
             
             conn = self.get_connection()
             cursor = conn.cursor()
@@ -173,6 +132,7 @@ class DatabaseManager:
         ''', (new_id, severity, category, description))
         
         conn.commit()
+        bump_table_version("cyber_incidents")
         conn.close()
         return new_id
     
@@ -185,6 +145,7 @@ class DatabaseManager:
             (new_status, incident_id)
         )
         conn.commit()
+        bump_table_version("cyber_incidents")
         rows_affected = cursor.rowcount
         conn.close()
         return rows_affected > 0
\ No newline at end of file
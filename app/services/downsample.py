@@ -0,0 +1,166 @@
+"""
+Downsampling for long time-series charts.
+
+A chart never needs more points than it has pixels. Trends are reduced to
+a fixed point budget on the server before they reach st.line_chart, so
+the payload and render cost stay flat however long the history is.
+
+Two modes:
+    LTTB    Largest-Triangle-Three-Buckets: keeps the points that preserve
+            the visual shape of the line. Good for smooth trends.
+    MINMAX  Keeps each bucket's lowest and highest point, so no spike or
+            dip is ever hidden. Good for bursty hourly counts.
+
+The get_*_trend_downsampled getters are cached per range, resolution and
+point budget, and invalidated with their table like the trends themselves.
+
+Usage:
+    chart = get_ticket_trend_downsampled(bucket=HOUR, by="priority", mode=MINMAX)
+    st.line_chart(chart)
+"""
+import numpy as np
+import pandas as pd
+from ..data.cache import cached_query
+from ..data.rollups import get_incident_trend, get_ticket_trend, DAY
+
+LTTB = "lttb"
+MINMAX = "minmax"
+
+# Points per chart; roughly one per horizontal pixel of a wide chart
+DEFAULT_MAX_POINTS = 500
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points LTTB keeps.
+
+    The first and last points are always kept. The rest are split into
+    n_out - 2 buckets. Each bucket keeps the point forming the largest
+    triangle with the point kept before it and the next bucket's average.
+    Bucket averages are computed in one vectorized pass; each bucket's
+    triangle areas are one NumPy expression.
+
+    Args:
+        x: Numeric x values, ascending
+        y: Numeric y values
+        n_out: Number of points to keep
+
+    Returns:
+        numpy.ndarray: Sorted indices into x/y
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    buckets = n_out - 2
+    # Bucket j covers [edges[j], edges[j + 1]) of the inner points 1..n-2
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # The point after the last bucket is the final point itself
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for j in range(buckets):
+        start, end = edges[j], edges[j + 1]
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - next_x[j]) * (ys - y[a]) - (x[a] - xs) * (next_y[j] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[j + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Indices of each bucket's minimum and maximum point.
+
+    Splits the series into at most n_out // 2 equal buckets, laid out as
+    the rows of a padded 2-D array, and takes argmin/argmax along each row.
+
+    Args:
+        y: Numeric y values
+        n_out: Number of points to keep (at most)
+
+    Returns:
+        numpy.ndarray: Sorted, unique indices into y
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    buckets = n_out // 2
+    if n <= n_out or buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // buckets)
+    rows = -(-n // size)
+    offsets = np.arange(rows) * size
+    # Padding never wins: +inf for the minimum, -inf for the maximum
+    padded = np.full(rows * size, np.inf)
+    padded[:n] = y
+    lows = offsets + padded.reshape(rows, size).argmin(axis=1)
+    padded[n:] = -np.inf
+    highs = offsets + padded.reshape(rows, size).argmax(axis=1)
+    return np.unique(np.concatenate([lows, highs]))
+
+
+def downsample_frame(frame, max_points=DEFAULT_MAX_POINTS, mode=LTTB):
+    """
+    Reduce a time-indexed DataFrame to at most max_points rows.
+
+    Each column is reduced on its own with a share of the budget, and the
+    rows any column kept are returned, so every line keeps its shape.
+
+    Args:
+        frame: DataFrame indexed by time (or any ascending numeric index)
+        max_points: Row budget
+        mode: LTTB or MINMAX
+
+    Returns:
+        pandas.DataFrame: Subset of frame's rows, in order
+    """
+    if len(frame) <= max_points or frame.empty:
+        return frame
+    if mode not in (LTTB, MINMAX):
+        raise ValueError(f"Unknown downsampling mode: {mode}")
+
+    per_column = max(3, max_points // max(1, len(frame.columns)))
+    index = frame.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.asarray(index, dtype=float)
+    # Relative x keeps the triangle areas well inside float precision
+    x = (x - x[0]).astype(float)
+
+    keep = [
+        lttb_indices(x, frame[column].to_numpy(), per_column) if mode == LTTB
+        else minmax_indices(frame[column].to_numpy(), per_column)
+        for column in frame.columns
+    ]
+    return frame.iloc[np.unique(np.concatenate(keep))]
+
+
+@cached_query("cyber_incidents")
+def get_incident_trend_downsampled(start=None, end=None, bucket=DAY, by=None, filters=None,
+                                   max_points=DEFAULT_MAX_POINTS, mode=LTTB):
+    """
+    get_incident_trend(), downsampled to max_points for charting.
+
+    Returns:
+        pandas.DataFrame: Same columns as the trend, at most about max_points rows
+    """
+    return downsample_frame(get_incident_trend(start, end, bucket, by, filters), max_points, mode)
+
+
+@cached_query("it_tickets")
+def get_ticket_trend_downsampled(start=None, end=None, bucket=DAY, by=None, filters=None,
+                                 max_points=DEFAULT_MAX_POINTS, mode=LTTB):
+    """
+    get_ticket_trend(), downsampled to max_points for charting.
+
+    Returns:
+        pandas.DataFrame: Same columns as the trend, at most about max_points rows
+    """
+    return downsample_frame(get_ticket_trend(start, end, bucket, by, filters), max_points, mode)
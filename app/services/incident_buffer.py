@@ -0,0 +1,286 @@
+"""
+Per-session write-behind buffer for incident CRUD.
+
+Form submissions on the Cybersecurity page go into the session's buffer
+and show up at once: the incidents table is the database page with the
+pending changes laid over it. The buffer is written out through the batch
+APIs (one insert, one status update and one delete transaction at most)
+once FLUSH_BATCH_SIZE changes are waiting or the oldest has waited
+FLUSH_INTERVAL_SECONDS.
+
+Every page's require_login() guard flushes whatever is due, and the
+Cybersecurity page also flushes on a timer while it is open. Logging out,
+or the session changing user, writes everything still pending under the
+user who made it and drops the buffer. Pending changes live only in the
+session, so one abandoned without logging out (tab closed, server
+restarted) loses whatever had not been flushed yet.
+
+Usage:
+    buffer = session_incident_buffer()
+    temp_id = buffer.add("Phishing", "High", "Suspicious email")
+    buffer.update_status(42, "Resolved")
+    buffer.maybe_flush()
+"""
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+from ..data.db import pooled_connection
+from ..data.incidents import (
+    insert_incidents, update_incident_statuses, delete_incidents, delete_incidents_reported_by
+)
+
+FLUSH_BATCH_SIZE = 20
+FLUSH_INTERVAL_SECONDS = 5
+
+SESSION_KEY = "incident_buffer"
+
+
+class IncidentWriteBuffer:
+    """
+    Pending incident inserts, status changes and deletes for one session.
+
+    New incidents get negative temporary ids until they are flushed, so
+    they can be updated or deleted like stored ones. Flushing remembers
+    each temporary id's real one, so edits made afterwards still reach
+    the right row.
+    """
+
+    def __init__(self, reported_by=None, batch_size=FLUSH_BATCH_SIZE,
+                 interval=FLUSH_INTERVAL_SECONDS):
+        self.reported_by = reported_by
+        self.batch_size = batch_size
+        self.interval = interval
+        self._inserts = {}   # temp id -> incident dict
+        self._statuses = {}  # stored id -> new status
+        self._deletes = set()
+        self._saved_ids = {}  # flushed temp id -> stored id
+        self._next_temp_id = -1
+        self._oldest = None
+        self._lock = threading.Lock()
+        self.flushes = 0
+
+    def _touch(self):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    def add(self, incident_type, severity, description, status="Open", date=None):
+        """
+        Queue a new incident.
+
+        Returns:
+            int: Temporary (negative) id for the pending incident
+        """
+        with self._lock:
+            temp_id = self._next_temp_id
+            self._next_temp_id -= 1
+            self._inserts[temp_id] = {
+                "date": date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "incident_type": incident_type,
+                "severity": severity,
+                "status": status,
+                "description": description,
+                "reported_by": self.reported_by,
+            }
+            self._touch()
+            return temp_id
+
+    def _resolve(self, incident_id):
+        if incident_id < 0 and incident_id not in self._inserts:
+            return self._saved_ids.get(incident_id)
+        return incident_id
+
+    def _checked(self, incident_id):
+        resolved = self._resolve(incident_id)
+        if resolved is None:
+            raise ValueError(f"Unknown pending incident id {incident_id}")
+        return resolved
+
+    def resolve_id(self, incident_id):
+        """
+        The id an incident is known by now: its stored id once a pending
+        incident has been flushed, otherwise the id given.
+
+        Returns:
+            int or None: None for a temporary id this buffer never issued
+        """
+        with self._lock:
+            return self._resolve(incident_id)
+
+    def update_status(self, incident_id, new_status):
+        """
+        Queue a status change for a stored or pending incident.
+
+        Raises:
+            ValueError: If incident_id is an unknown temporary id
+        """
+        with self._lock:
+            incident_id = self._checked(incident_id)
+            if incident_id in self._inserts:
+                self._inserts[incident_id]["status"] = new_status
+            elif incident_id not in self._deletes:
+                self._statuses[incident_id] = new_status
+                self._touch()
+
+    def delete(self, incident_id):
+        """
+        Queue a delete; a pending incident is simply dropped.
+
+        Raises:
+            ValueError: If incident_id is an unknown temporary id
+        """
+        with self._lock:
+            incident_id = self._checked(incident_id)
+            if self._inserts.pop(incident_id, None) is None:
+                self._statuses.pop(incident_id, None)
+                self._deletes.add(incident_id)
+                self._touch()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._inserts) + len(self._statuses) + len(self._deletes)
+
+    def discard(self):
+        """Drop every pending change without writing it."""
+        with self._lock:
+            self._inserts.clear()
+            self._statuses.clear()
+            self._deletes.clear()
+            self._oldest = None
+
+    def flush_due(self):
+        """True once the batch is full or the oldest change has waited long enough."""
+        with self._lock:
+            if self._oldest is None:
+                return False
+            pending = len(self._inserts) + len(self._statuses) + len(self._deletes)
+            return pending >= self.batch_size or time.monotonic() - self._oldest >= self.interval
+
+    def flush(self):
+        """
+        Write every pending change through the batch APIs.
+
+        Each kind is cleared from the buffer once its transaction commits, so
+        after an error only the unwritten changes remain pending.
+
+        Returns:
+            dict: inserted (new ids), updated and deleted counts
+        """
+        with self._lock:
+            inserts = list(self._inserts.items())
+            statuses = dict(self._statuses)
+            deletes = sorted(self._deletes)
+
+            new_ids = insert_incidents([record for _, record in inserts]) if inserts else []
+            for (temp_id, _), new_id in zip(inserts, new_ids):
+                del self._inserts[temp_id]
+                self._saved_ids[temp_id] = new_id
+
+            updated = deleted = 0
+            if statuses or deletes:
+                with pooled_connection() as conn:
+                    if statuses:
+                        updated = update_incident_statuses(conn, statuses)["updated"]
+                        self._statuses.clear()
+                    if deletes:
+                        deleted = delete_incidents(conn, deletes)["deleted"]
+                        self._deletes.clear()
+
+            self._oldest = None
+            self.flushes += 1
+        return {"inserted": new_ids, "updated": updated, "deleted": deleted}
+
+    def maybe_flush(self):
+        """
+        Flush if due.
+
+        Returns:
+            dict or None: flush() result, or None if nothing was written
+        """
+        return self.flush() if self.flush_due() else None
+
+    def overlay(self, page, include_new=True):
+        """
+        Show pending changes on a page of incidents read from the database.
+
+        Args:
+            page: DataFrame of cyber_incidents rows
+            include_new: Prepend pending incidents (for the newest page)
+
+        Returns:
+            pandas.DataFrame: The page as it will look once flushed
+        """
+        with self._lock:
+            statuses = dict(self._statuses)
+            deletes = set(self._deletes)
+            inserts = list(self._inserts.items())
+
+        view = page[~page["id"].isin(deletes)].copy()
+        if statuses:
+            changed = view["id"].map(statuses)
+            view["status"] = changed.fillna(view["status"])
+        if include_new and inserts:
+            pending = pd.DataFrame([
+                {"id": temp_id, "timestamp": r["date"], "category": r["incident_type"],
+                 "severity": r["severity"], "status": r["status"],
+                 "description": r["description"], "reported_by": r["reported_by"]}
+                for temp_id, r in inserts
+            ]).reindex(columns=view.columns)
+            view = pd.concat([pending.iloc[::-1], view], ignore_index=True) if len(view) else pending
+        return view
+
+
+def session_incident_buffer():
+    """
+    The current Streamlit session's IncidentWriteBuffer, created on first use.
+
+    A buffer left by another user of the session is flushed and replaced,
+    so pending changes are never reported under the wrong name.
+    """
+    import streamlit as st
+    username = st.session_state.get("username")
+    buffer = st.session_state.get(SESSION_KEY)
+    if buffer is not None and buffer.reported_by != username:
+        sync_session_incident_buffer(username)
+        buffer = None
+    if buffer is None:
+        buffer = st.session_state[SESSION_KEY] = IncidentWriteBuffer(reported_by=username)
+    return buffer
+
+
+def sync_session_incident_buffer(username):
+    """
+    Page-guard hook: write out the session's pending incident changes.
+
+    Flushes what is due, whichever page is showing. If the buffer belongs
+    to someone other than `username` (logout, expired token, another
+    login), everything pending is flushed under its own user and the
+    buffer is dropped - even if that flush fails.
+
+    Args:
+        username: Who the session now belongs to (None once logged out)
+
+    Returns:
+        dict or None: flush() result, or None if nothing was written
+    """
+    import streamlit as st
+    buffer = st.session_state.get(SESSION_KEY)
+    if buffer is None:
+        return None
+    if buffer.reported_by != username:
+        del st.session_state[SESSION_KEY]
+        return buffer.flush() if len(buffer) else None
+    return buffer.maybe_flush()
+
+
+def clear_user_incidents(username, buffer=None):
+    """
+    Discard a user's pending changes and delete every incident they reported.
+
+    Returns:
+        int: Number of stored incidents deleted
+    """
+    if buffer is not None:
+        buffer.discard()
+    with pooled_connection() as conn:
+        return delete_incidents_reported_by(conn, username)
@@ -0,0 +1,170 @@
+"""
+Token-bucket throttling for login attempts.
+
+Every attempt takes one token from the username's bucket and one from the
+client's bucket; buckets refill at a steady rate. When either is empty the
+attempt is rejected before any bcrypt work, so a credential-stuffing burst
+costs a dictionary lookup per try instead of a full password hash.
+
+Buckets live in memory. Partly drained ones are snapshotted to the
+login_throttle table every SNAPSHOT_INTERVAL seconds and reloaded on start,
+so restarting the app doesn't hand an attacker a fresh allowance.
+"""
+import threading
+import time
+from ..data.db import DB_PATH, pooled_connection
+
+# Per username: a burst of 5 tries, then one every 12 seconds
+USERNAME_CAPACITY = 5
+USERNAME_REFILL_PER_SEC = 1 / 12
+# Per client: room for a few users behind one NAT, then one every 2 seconds
+CLIENT_CAPACITY = 10
+CLIENT_REFILL_PER_SEC = 0.5
+SNAPSHOT_INTERVAL = 30
+# Full buckets carry no state and are dropped first once there are this many
+MAX_BUCKETS = 100_000
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled at `rate` per second."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, rate, tokens=None, updated=None):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity if tokens is None else tokens
+        self.updated = time.time() if updated is None else updated
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until one token is available (0 if one is now)."""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def is_full(self):
+        return self.tokens >= self.capacity
+
+
+class LoginThrottle:
+    """Per-username and per-client token buckets with SQLite snapshots."""
+
+    def __init__(self, db_path=DB_PATH,
+                 username_capacity=USERNAME_CAPACITY, username_rate=USERNAME_REFILL_PER_SEC,
+                 client_capacity=CLIENT_CAPACITY, client_rate=CLIENT_REFILL_PER_SEC,
+                 snapshot_interval=SNAPSHOT_INTERVAL):
+        self.db_path = db_path
+        self.limits = {
+            "user": (username_capacity, username_rate),
+            "client": (client_capacity, client_rate),
+        }
+        self.snapshot_interval = snapshot_interval
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._last_snapshot = time.time()
+        self.rejected = 0
+
+    def _bucket(self, kind, name, now):
+        key = f"{kind}:{name}"
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            capacity, rate = self.limits[kind]
+            bucket = self._buckets[key] = TokenBucket(capacity, rate, updated=now)
+        else:
+            bucket.refill(now)
+        return bucket
+
+    def allow(self, username, client_id=None):
+        """
+        Take a token for one login attempt, if both buckets have one.
+
+        Args:
+            username: Username being tried
+            client_id: Caller's address or session id (optional)
+
+        Returns:
+            tuple: (allowed: bool, retry_after_seconds: float)
+        """
+        if not self._loaded:
+            self.load()
+        now = time.time()
+        with self._lock:
+            if len(self._buckets) > MAX_BUCKETS:
+                self._prune(now)
+            buckets = [self._bucket("user", username, now)]
+            if client_id:
+                buckets.append(self._bucket("client", client_id, now))
+            retry_after = max(b.wait_time() for b in buckets)
+            if retry_after > 0:
+                self.rejected += 1
+            else:
+                # Only spend tokens when the attempt actually goes ahead
+                for bucket in buckets:
+                    bucket.tokens -= 1
+            snapshot_due = now - self._last_snapshot >= self.snapshot_interval
+            if snapshot_due:
+                self._last_snapshot = now
+        if snapshot_due:
+            self.snapshot()
+        return retry_after == 0, retry_after
+
+    def record_success(self, username, client_id=None):
+        """
+        A correct password isn't an attack: refill the username's bucket and
+        give the client back the token this attempt took.
+        """
+        with self._lock:
+            self._buckets.pop(f"user:{username}", None)
+            bucket = self._buckets.get(f"client:{client_id}") if client_id else None
+            if bucket is not None:
+                bucket.tokens = min(bucket.capacity, bucket.tokens + 1)
+
+    def _prune(self, now):
+        """Forget buckets that have refilled completely, then the oldest if still too many."""
+        for key, bucket in list(self._buckets.items()):
+            bucket.refill(now)
+            if bucket.is_full():
+                del self._buckets[key]
+        # Leave headroom so allow() doesn't prune again on the next call
+        keep = MAX_BUCKETS * 9 // 10
+        for key in list(self._buckets)[:max(0, len(self._buckets) - keep)]:
+            del self._buckets[key]
+
+    def snapshot(self):
+        """Persist every partly drained bucket to login_throttle."""
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            rows = [(key, b.tokens, b.updated) for key, b in self._buckets.items()]
+        try:
+            with pooled_connection(self.db_path) as conn:
+                conn.execute("DELETE FROM login_throttle")
+                conn.executemany(
+                    "INSERT INTO login_throttle (bucket_key, tokens, updated_at) VALUES (?, ?, ?)",
+                    rows
+                )
+        except Exception as e:
+            print(f" Could not snapshot login throttle: {e}")
+
+    def load(self):
+        """Restore buckets from the last snapshot."""
+        self._loaded = True
+        try:
+            with pooled_connection(self.db_path) as conn:
+                rows = conn.execute(
+                    "SELECT bucket_key, tokens, updated_at FROM login_throttle"
+                ).fetchall()
+        except Exception as e:
+            print(f" Could not load login throttle snapshot: {e}")
+            return
+        with self._lock:
+            for key, tokens, updated in rows:
+                kind = key.split(":", 1)[0]
+                if kind in self.limits and key not in self._buckets:
+                    capacity, rate = self.limits[kind]
+                    self._buckets[key] = TokenBucket(capacity, rate, tokens, updated)
+            if len(self._buckets) > MAX_BUCKETS:
+                self._prune(time.time())
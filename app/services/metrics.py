@@ -0,0 +1,306 @@
+"""
+KPIs for the dashboard pages, computed from the domain tables.
+
+Each page's whole KPI set comes from one call: a handful of aggregate
+queries (one conditional-SUM pass per table plus the breakdowns) inside a
+single read transaction, so every number on the page describes the same
+snapshot. Results go through the shared query cache, so across sessions a
+render is one cache lookup until the tables are written.
+
+Period KPIs compare the last PERIOD_DAYS before `as_of` with the
+PERIOD_DAYS before that. `as_of` defaults to the newest row's timestamp,
+which keeps historical data meaningful and the cache key stable.
+
+Each KPI is a dict {"value": ..., "delta": ...}; delta is None where no
+earlier period applies. Returned dicts and DataFrames are shared through
+the cache - treat them as read-only.
+"""
+import pandas as pd
+from ..data.db import read_snapshot
+from ..data.cache import cached_query
+from ..data.timestamps import to_epoch
+
+PERIOD_DAYS = 30
+DAY_SECONDS = 24 * 60 * 60
+
+CLOSED_STATUSES = ("Resolved", "Closed")
+HIGH_SEVERITIES = ("High", "Critical")
+HIGH_PRIORITIES = ("High", "Critical")
+
+# Hours allowed to resolve a ticket, by priority
+SLA_TARGET_HOURS = {"Critical": 8, "High": 24, "Medium": 48, "Low": 72}
+DEFAULT_SLA_HOURS = 72
+
+# Columns that make a datasets_metadata row complete
+DATASET_FIELDS = ("name", "category", "source", "rows", "columns", "file_size_mb",
+                  "uploaded_by", "upload_date", "description")
+
+
+def _in(values):
+    return "(" + ", ".join(f"'{v}'" for v in values) + ")"
+
+
+def _kpi(value, previous=None):
+    delta = None if previous is None or value is None else value - previous
+    return {"value": value, "delta": delta}
+
+
+def _periods(conn, table, epoch_column, as_of, period_days):
+    """
+    Epoch bounds (as_of, current_start, previous_start) for a table.
+
+    Current period: (current_start, as_of]; previous: (previous_start, current_start].
+    """
+    if as_of is None:
+        end = conn.execute(f"SELECT MAX({epoch_column}) FROM {table}").fetchone()[0] or 0
+    else:
+        end = to_epoch(as_of)
+    span = period_days * DAY_SECONDS
+    return {"as_of": end, "cur": end - span, "prev": end - 2 * span}
+
+
+def _read(conn, compute):
+    """Run compute(conn) inside one read transaction (one consistent snapshot)."""
+    if conn is not None:
+        return compute(conn)
+    with read_snapshot() as conn:
+        return compute(conn)
+
+
+def _security(conn, as_of, period_days):
+    bounds = _periods(conn, "cyber_incidents", "timestamp_epoch", as_of, period_days)
+    current = "timestamp_epoch > :cur AND timestamp_epoch <= :as_of"
+    previous = "timestamp_epoch > :prev AND timestamp_epoch <= :cur"
+    high = f"severity IN {_in(HIGH_SEVERITIES)}"
+    row = conn.execute(f"""
+        SELECT
+            COUNT(*),
+            SUM(status NOT IN {_in(CLOSED_STATUSES)}),
+            SUM({current}),
+            SUM({previous}),
+            SUM({high} AND {current}),
+            SUM({high} AND {previous}),
+            SUM({high} AND status NOT IN {_in(CLOSED_STATUSES)})
+        FROM cyber_incidents
+    """, bounds).fetchone()
+    total, open_, cur, prev, high_cur, high_prev, high_open = (v or 0 for v in row)
+
+    by_category = pd.read_sql_query("""
+        SELECT COALESCE(category, 'Unknown') AS category, COUNT(*) AS count
+        FROM cyber_incidents
+        GROUP BY 1
+        ORDER BY count DESC
+    """, conn).set_index("category")
+    by_status = pd.read_sql_query("""
+        SELECT status, COUNT(*) AS count
+        FROM cyber_incidents
+        GROUP BY status
+        ORDER BY count DESC
+    """, conn).set_index("status")
+
+    return {
+        "as_of": pd.Timestamp(bounds["as_of"], unit="s"),
+        "period_days": period_days,
+        "total_incidents": _kpi(total),
+        "incidents": _kpi(cur, prev),
+        "high_severity": _kpi(high_cur, high_prev),
+        "open_incidents": _kpi(open_),
+        "open_high_severity": _kpi(high_open),
+        "by_category": by_category,
+        "by_status": by_status,
+    }
+
+
+@cached_query("cyber_incidents")
+def get_security_metrics(as_of=None, period_days=PERIOD_DAYS, conn=None):
+    """
+    Security KPIs for the Dashboard and Cybersecurity pages.
+
+    Args:
+        as_of: End of the current period (default: newest incident)
+        period_days: Length of each comparison period
+        conn: Database connection (default: a pooled one, in its own read transaction)
+
+    Returns:
+        dict: KPIs incidents and high_severity (this period, delta vs the
+            previous one), total_incidents, open_incidents and
+            open_high_severity (current totals); by_category and by_status
+            count DataFrames; as_of and period_days
+    """
+    return _read(conn, lambda c: _security(c, as_of, period_days))
+
+
+def _sla_met_expr():
+    cases = " ".join(f"WHEN '{p}' THEN {h}" for p, h in SLA_TARGET_HOURS.items())
+    return f"resolution_time_hours <= CASE priority {cases} ELSE {DEFAULT_SLA_HOURS} END"
+
+
+def _it(conn, as_of, period_days):
+    bounds = _periods(conn, "it_tickets", "created_at_epoch", as_of, period_days)
+    current = "created_at_epoch > :cur AND created_at_epoch <= :as_of"
+    previous = "created_at_epoch > :prev AND created_at_epoch <= :cur"
+    is_open = f"status NOT IN {_in(CLOSED_STATUSES)}"
+    resolved = f"status IN {_in(CLOSED_STATUSES)} AND resolution_time_hours IS NOT NULL"
+    sla_met = _sla_met_expr()
+    row = conn.execute(f"""
+        SELECT
+            COUNT(*),
+            SUM({is_open}),
+            SUM({is_open} AND priority IN {_in(HIGH_PRIORITIES)}),
+            SUM({current}),
+            SUM({previous}),
+            AVG(CASE WHEN {resolved} AND {current} THEN resolution_time_hours END),
+            AVG(CASE WHEN {resolved} AND {previous} THEN resolution_time_hours END),
+            AVG(CASE WHEN {resolved} AND {current} THEN ({sla_met}) END),
+            AVG(CASE WHEN {resolved} AND {previous} THEN ({sla_met}) END),
+            AVG(CASE WHEN {resolved} THEN resolution_time_hours END),
+            AVG(CASE WHEN {resolved} THEN ({sla_met}) END)
+        FROM it_tickets
+    """, bounds).fetchone()
+    (total, open_, high_open, cur, prev, res_cur, res_prev,
+     sla_cur, sla_prev, res_all, sla_all) = row
+
+    def pct(rate):
+        return None if rate is None else rate * 100
+
+    workload = pd.read_sql_query(f"""
+        SELECT
+            COALESCE(assigned_to, 'Unassigned') AS assigned_to,
+            SUM({is_open}) AS open,
+            SUM(status IN {_in(CLOSED_STATUSES)}) AS resolved,
+            AVG(CASE WHEN {resolved} THEN resolution_time_hours END) AS avg_resolution_hours,
+            AVG(CASE WHEN {resolved} THEN ({sla_met}) END) * 100 AS sla_pct
+        FROM it_tickets
+        GROUP BY 1
+        ORDER BY open DESC, assigned_to
+    """, conn).set_index("assigned_to")
+    by_status = pd.read_sql_query("""
+        SELECT status, COUNT(*) AS count
+        FROM it_tickets
+        GROUP BY status
+        ORDER BY count DESC
+    """, conn).set_index("status")
+
+    return {
+        "as_of": pd.Timestamp(bounds["as_of"], unit="s"),
+        "period_days": period_days,
+        "total_tickets": _kpi(total or 0),
+        "tickets_opened": _kpi(cur or 0, prev or 0),
+        "open_tickets": _kpi(open_ or 0),
+        "open_high_priority": _kpi(high_open or 0),
+        "avg_resolution_hours": _kpi(res_cur, res_prev) if res_cur is not None else _kpi(res_all),
+        "sla_compliance_pct": (_kpi(pct(sla_cur), pct(sla_prev)) if sla_cur is not None
+                               else _kpi(pct(sla_all))),
+        "workload": workload,
+        "by_status": by_status,
+    }
+
+
+@cached_query("it_tickets")
+def get_it_metrics(as_of=None, period_days=PERIOD_DAYS, conn=None):
+    """
+    Ticket KPIs for the IT Operations page.
+
+    SLA compliance is the share of resolved tickets closed within
+    SLA_TARGET_HOURS for their priority. Period KPIs fall back to all
+    resolved tickets when none were resolved in the current period.
+
+    Args:
+        as_of: End of the current period (default: newest ticket)
+        period_days: Length of each comparison period
+        conn: Database connection (default: a pooled one, in its own read transaction)
+
+    Returns:
+        dict: KPIs tickets_opened, avg_resolution_hours and
+            sla_compliance_pct (this period, delta vs the previous one),
+            total_tickets, open_tickets and open_high_priority (current
+            totals); workload per assignee and by_status DataFrames; as_of
+            and period_days
+    """
+    return _read(conn, lambda c: _it(c, as_of, period_days))
+
+
+def _data_science(conn, as_of, period_days):
+    bounds = _periods(conn, "datasets_metadata", "upload_date_epoch", as_of, period_days)
+    current = "upload_date_epoch > :cur AND upload_date_epoch <= :as_of"
+    previous = "upload_date_epoch > :prev AND upload_date_epoch <= :cur"
+    filled = " + ".join(f"({field} IS NOT NULL)" for field in DATASET_FIELDS)
+    row = conn.execute(f"""
+        SELECT
+            COUNT(*),
+            SUM({current}),
+            SUM({previous}),
+            SUM(rows),
+            SUM(CASE WHEN {current} THEN rows END),
+            SUM(file_size_mb),
+            AVG(columns),
+            AVG(({filled}) * 1.0 / {len(DATASET_FIELDS)}),
+            COUNT(DISTINCT uploaded_by)
+        FROM datasets_metadata
+    """, bounds).fetchone()
+    total, cur, prev, records, records_cur, size_mb, avg_columns, completeness, uploaders = row
+
+    datasets = pd.read_sql_query("""
+        SELECT name, category, source, rows, columns, file_size_mb, uploaded_by, upload_date
+        FROM datasets_metadata
+        ORDER BY upload_date_epoch DESC, id DESC
+    """, conn)
+    uploads = pd.read_sql_query("""
+        SELECT strftime('%Y-%m', upload_date) AS month, COUNT(*) AS uploads, SUM(rows) AS records
+        FROM datasets_metadata
+        WHERE month IS NOT NULL
+        GROUP BY month
+        ORDER BY month
+    """, conn).set_index("month")
+
+    return {
+        "as_of": pd.Timestamp(bounds["as_of"], unit="s"),
+        "period_days": period_days,
+        "datasets": _kpi(total or 0, (total or 0) - (cur or 0)),
+        "uploads": _kpi(cur or 0, prev or 0),
+        "total_records": _kpi(records or 0, (records or 0) - (records_cur or 0)),
+        "total_size_mb": _kpi(size_mb),
+        "avg_columns": _kpi(avg_columns),
+        "completeness_pct": _kpi(None if completeness is None else completeness * 100),
+        "uploaders": _kpi(uploaders or 0),
+        "datasets_table": datasets,
+        "uploads_by_month": uploads,
+    }
+
+
+@cached_query("datasets_metadata")
+def get_data_science_metrics(as_of=None, period_days=PERIOD_DAYS, conn=None):
+    """
+    Dataset KPIs for the Data Science page.
+
+    Args:
+        as_of: End of the current period (default: newest upload)
+        period_days: Length of each comparison period
+        conn: Database connection (default: a pooled one, in its own read transaction)
+
+    Returns:
+        dict: KPIs datasets and total_records (delta = added this period),
+            uploads (this period vs the previous one), total_size_mb,
+            avg_columns, completeness_pct (share of filled metadata fields)
+            and uploaders; datasets_table and uploads_by_month DataFrames;
+            as_of and period_days
+    """
+    return _read(conn, lambda c: _data_science(c, as_of, period_days))
+
+
+def format_kpi(kpi, fmt="{:,.0f}", unit=""):
+    """
+    Format a KPI for st.metric.
+
+    Args:
+        kpi: {"value": ..., "delta": ...} from one of the get_*_metrics functions
+        fmt: Format for the value (the delta gets the same, with a sign)
+        unit: Suffix for both, e.g. "%" or " h"
+
+    Returns:
+        tuple: (value, delta) strings; value is "n/a" and delta None when missing
+    """
+    value, delta = kpi["value"], kpi["delta"]
+    value_text = "n/a" if value is None else fmt.format(value) + unit
+    delta_text = None if delta is None else fmt.replace("{:", "{:+", 1).format(delta) + unit
+    return value_text, delta_text
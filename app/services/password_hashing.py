@@ -0,0 +1,290 @@
+"""
+Bounded worker pool for bcrypt hashing and verification.
+
+bcrypt is deliberately slow (hundreds of ms per call). Running it inline on
+every Streamlit script thread lets a burst of logins oversubscribe the CPU
+and stall dashboard renders. All hashing goes through one small thread pool
+instead (bcrypt releases the GIL, so threads run in parallel), with a cap on
+how many calls may be queued; beyond that, callers get HashingOverloaded
+after a short wait rather than queueing behind the whole storm.
+
+The bcrypt cost is calibrated once per process so that one verify takes
+about TARGET_VERIFY_MS on this machine (see calibrate_rounds); hashes made at
+another cost are flagged by needs_rehash and upgraded on the next login.
+
+Usage:
+    hasher = get_hasher()
+    password_hash = hasher.hash_password("SecurePass123!")
+    ok = hasher.check_password("SecurePass123!", password_hash)
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+# Calls allowed to wait for a worker, on top of the ones running
+DEFAULT_MAX_QUEUED = 32
+# How long a caller may wait for a queue slot before giving up
+DEFAULT_ADMIT_TIMEOUT = 2.0
+# Recent queue-wait samples kept for the percentile metrics
+METRIC_SAMPLES = 1000
+
+# Work-factor calibration: aim for this verify latency, but never go below
+# MIN_ROUNDS however slow the machine. BCRYPT_ROUNDS pins the cost instead.
+TARGET_VERIFY_MS = 250
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+CALIBRATION_ROUNDS = 8
+
+BCRYPT_HASH_PATTERN = re.compile(r"^\$2[abxy]?\$(\d{2})\$[./A-Za-z0-9]{53}$")
+
+
+class HashingOverloaded(RuntimeError):
+    """Raised when the hashing queue is full."""
+
+
+class PasswordHasher:
+    """Thread pool for bcrypt calls with a concurrency cap and queue-time metrics."""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_queued=DEFAULT_MAX_QUEUED,
+                 admit_timeout=DEFAULT_ADMIT_TIMEOUT):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.admit_timeout = admit_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._lock = threading.Lock()
+        self._queue_waits = deque(maxlen=METRIC_SAMPLES)
+        self._run_times = deque(maxlen=METRIC_SAMPLES)
+        self.completed = 0
+        self.rejected = 0
+
+    def _run(self, func, submitted, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            self._slots.release()
+            with self._lock:
+                self._queue_waits.append(started - submitted)
+                self._run_times.append(finished - started)
+                self.completed += 1
+
+    def submit(self, func, *args):
+        """
+        Queue a call on the pool.
+
+        Returns:
+            concurrent.futures.Future: Resolves to func's result
+
+        Raises:
+            HashingOverloaded: If no queue slot frees up within admit_timeout
+        """
+        if not self._slots.acquire(timeout=self.admit_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise HashingOverloaded("Too many password checks in progress")
+        try:
+            return self._pool.submit(self._run, func, time.perf_counter(), *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def hash_password(self, password, rounds=None):
+        """
+        Hash a password with a fresh salt.
+
+        Args:
+            password: Plain-text password
+            rounds: bcrypt cost factor (default: target_rounds())
+
+        Returns:
+            str: bcrypt hash
+        """
+        salt = bcrypt.gensalt(target_rounds() if rounds is None else rounds)
+        return self.submit(bcrypt.hashpw, password.encode("utf-8"), salt).result().decode("utf-8")
+
+    def check_password(self, password, password_hash):
+        """
+        Check a password against a stored bcrypt hash.
+
+        Returns:
+            bool: True if they match
+        """
+        return self.submit(
+            bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8")
+        ).result()
+
+    def stats(self):
+        """
+        Pool metrics.
+
+        Returns:
+            dict: completed and rejected counts, plus queue-wait and run-time
+                averages and 95th percentiles (ms) over recent calls
+        """
+        with self._lock:
+            waits = sorted(self._queue_waits)
+            runs = sorted(self._run_times)
+            completed, rejected = self.completed, self.rejected
+
+        def avg_ms(samples):
+            return sum(samples) / len(samples) * 1000 if samples else 0.0
+
+        def p95_ms(samples):
+            return samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000 if samples else 0.0
+
+        return {
+            "workers": self.max_workers,
+            "completed": completed,
+            "rejected": rejected,
+            "queue_wait_avg_ms": avg_ms(waits),
+            "queue_wait_p95_ms": p95_ms(waits),
+            "run_avg_ms": avg_ms(runs),
+            "run_p95_ms": p95_ms(runs),
+        }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+def calibrate_rounds(target_ms=TARGET_VERIFY_MS, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    """
+    Pick the bcrypt cost whose verify time is closest to target_ms here.
+
+    Each extra round doubles the work, so one cheap timing at
+    CALIBRATION_ROUNDS is enough to extrapolate to every cost.
+
+    Returns:
+        int: Work factor between min_rounds and max_rounds
+    """
+    password = b"calibration-password"
+    password_hash = bcrypt.hashpw(password, bcrypt.gensalt(CALIBRATION_ROUNDS))
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        bcrypt.checkpw(password, password_hash)
+        timings.append(time.perf_counter() - started)
+    base_ms = min(timings) * 1000
+
+    rounds = CALIBRATION_ROUNDS
+    # Go up while the next cost is closer to the target than this one
+    while rounds < max_rounds and abs(base_ms * 2 ** (rounds + 1 - CALIBRATION_ROUNDS) - target_ms) \
+            < abs(base_ms * 2 ** (rounds - CALIBRATION_ROUNDS) - target_ms):
+        rounds += 1
+    return max(min_rounds, rounds)
+
+
+_target_rounds = None
+_rounds_lock = threading.Lock()
+
+
+def target_rounds():
+    """
+    Work factor for new hashes: BCRYPT_ROUNDS if set, else calibrated once.
+
+    Returns:
+        int: bcrypt cost
+    """
+    global _target_rounds
+    with _rounds_lock:
+        if _target_rounds is None:
+            pinned = os.environ.get("BCRYPT_ROUNDS")
+            _target_rounds = int(pinned) if pinned else calibrate_rounds()
+        return _target_rounds
+
+
+def hash_rounds(password_hash):
+    """
+    Work factor a bcrypt hash was made with.
+
+    Returns:
+        int or None: The cost, or None if this isn't a bcrypt hash
+    """
+    match = BCRYPT_HASH_PATTERN.match(password_hash or "")
+    return int(match.group(1)) if match else None
+
+
+def needs_rehash(password_hash):
+    """True if a hash's cost differs from target_rounds() (or it isn't bcrypt)."""
+    return hash_rounds(password_hash) != target_rounds()
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher():
+    """Get the process-wide PasswordHasher, creating it on first use."""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher()
+        return _hasher
+
+
+def configure_hasher(max_workers=DEFAULT_MAX_WORKERS, max_queued=DEFAULT_MAX_QUEUED,
+                     admit_timeout=DEFAULT_ADMIT_TIMEOUT):
+    """
+    Replace the process-wide PasswordHasher with one using new limits.
+
+    Returns:
+        PasswordHasher: The new hasher
+    """
+    global _hasher
+    with _hasher_lock:
+        old, _hasher = _hasher, PasswordHasher(max_workers, max_queued, admit_timeout)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _hasher
+
+
+def hash_password(password, rounds=None):
+    """Hash a password on the shared pool (see PasswordHasher.hash_password)."""
+    return get_hasher().hash_password(password, rounds)
+
+
+def check_password(password, password_hash):
+    """Check a password on the shared pool (see PasswordHasher.check_password)."""
+    return get_hasher().check_password(password, password_hash)
+
+
+def rehash_if_needed(password, password_hash, save):
+    """
+    After a successful login, upgrade a hash made at the wrong cost.
+
+    The new hash is computed on the pool without blocking the caller, then
+    handed to save(new_hash). Skipped quietly if the pool is overloaded -
+    the next login will try again.
+
+    Args:
+        password: The plain-text password that just verified
+        password_hash: Its stored hash
+        save: Callable(new_hash) that stores the upgraded hash
+
+    Returns:
+        bool: True if a rehash was scheduled
+    """
+    if not needs_rehash(password_hash):
+        return False
+    try:
+        future = get_hasher().submit(
+            bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(target_rounds())
+        )
+    except HashingOverloaded:
+        return False
+
+    def _save(f):
+        if f.exception() is None:
+            try:
+                save(f.result().decode("utf-8"))
+            except Exception as e:
+                print(f" Could not store rehashed password: {e}")
+
+    future.add_done_callback(_save)
+    return True
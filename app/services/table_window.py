@@ -0,0 +1,67 @@
+import streamlit as st
+from ..data.pagination import NEXT, PREV
+
+
+def _go_newer(key):
+    state = st.session_state[key]
+    state.update(cursor=state["first_id"], direction=PREV, page_no=state["page_no"] - 1)
+
+
+def _go_older(key):
+    state = st.session_state[key]
+    state.update(cursor=state["last_id"], direction=NEXT, page_no=state["page_no"] + 1)
+
+
+def paginated_window(key, fetch_page, page_size=25, total_estimate=None):
+    """
+    Render Newer/Older controls and return the visible page of a table.
+
+    Only the current page is read from the database; the cursor state lives
+    in st.session_state under `key`, so reruns don't reload the whole table.
+
+    Args:
+        key: Unique session-state key for this table
+        fetch_page: Callable(cursor, direction, page_size) -> (page, next_cursor)
+        page_size: Rows per page
+        total_estimate: Optional row-count estimate to show in the caption
+
+    Returns:
+        pandas.DataFrame: The rows to display
+    """
+    state = st.session_state.setdefault(key, {
+        "cursor": None, "direction": NEXT, "page_no": 1,
+        "first_id": None, "last_id": None,
+    })
+
+    page, next_cursor = fetch_page(state["cursor"], state["direction"], page_size)
+    if page.empty and state["cursor"] is not None:
+        # Rows under the cursor were deleted - fall back to the newest page
+        state.update(cursor=None, direction=NEXT, page_no=1)
+        page, next_cursor = fetch_page(None, NEXT, page_size)
+
+    if state["direction"] == NEXT:
+        has_older = next_cursor is not None
+        has_newer = state["cursor"] is not None
+    else:
+        has_newer = next_cursor is not None
+        has_older = True
+    if not has_newer:
+        state["page_no"] = 1
+    if not page.empty:
+        state["first_id"] = int(page["id"].iloc[0])
+        state["last_id"] = int(page["id"].iloc[-1])
+
+    col_newer, col_info, col_older = st.columns([1, 3, 1])
+    with col_newer:
+        st.button("← Newer", key=f"{key}_newer", disabled=not has_newer,
+                  on_click=_go_newer, args=(key,))
+    with col_info:
+        caption = f"Page {state['page_no']}"
+        if total_estimate is not None:
+            caption += f" · ~{total_estimate:,} rows"
+        st.caption(caption)
+    with col_older:
+        st.button("Older →", key=f"{key}_older", disabled=not has_older,
+                  on_click=_go_older, args=(key,))
+
+    return page
@@ -1,16 +1,14 @@
-import bcrypt
-import sqlite3
 from pathlib import Path
-from ..data.db import connect_database
-from ..data.users import get_user_by_username, insert_user
-from ..data.schema import create_users_table
+from ..data.db import pooled_connection
+from ..data.users import get_user_by_username, insert_user, update_password_hash, get_all_usernames, insert_users
+from .password_hashing import get_hasher, HashingOverloaded, rehash_if_needed, BCRYPT_HASH_PATTERN
+
+VALID_ROLES = {"user", "analyst", "admin"}
+IMPORT_BATCH_SIZE = 5000
 def register_user(username, password, role='user'):
     """Register new user with password hashing."""
     # Hash password
-    password_hash = bcrypt.hashpw(
-        password.encode('utf-8'),
-        bcrypt.gensalt()
-    ).decode('utf-8')
+    password_hash = get_hasher().hash_password(password)
     
     # Insert into database
     insert_user(username, password_hash, role)
@@ -23,10 +21,89 @@ def login_user(username, password):
     
     # Verify password
     stored_hash = user[2]  # password_hash column
-    if bcrypt.checkpw(password.encode('utf-8'), 
-stored_hash.encode('utf-8')):
+    try:
+        matched = get_hasher().check_password(password, stored_hash)
+    except HashingOverloaded:
+        return False, "Too many logins in progress. Please try again."
+    if matched:
+        # Upgrade hashes made at an outdated cost (e.g. migrated from users.txt)
+        rehash_if_needed(password, stored_hash,
+                         lambda new_hash: update_password_hash(username, new_hash, stored_hash))
         return True, f"Login successful!"
     return False, "Incorrect password."
+def parse_user_line(line):
+    """
+    Parse and validate one users.txt line: username,password_hash[,role]
+
+    Returns:
+        tuple: (username, password_hash, role), None for blank/comment
+            lines, or "invalid" if the line is malformed
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    parts = [p.strip() for p in line.split(",")]
+    if len(parts) < 2 or len(parts) > 3 or not parts[0]:
+        return "invalid"
+    username, password_hash = parts[0], parts[1]
+    role = parts[2] if len(parts) == 3 else "user"
+    if not BCRYPT_HASH_PATTERN.match(password_hash) or role not in VALID_ROLES:
+        return "invalid"
+    return username, password_hash, role
+
+
+def import_users_from_file(filepath="users.txt", batch_size=IMPORT_BATCH_SIZE):
+    """
+    Bulk-import users from a username,password_hash[,role] file.
+
+    The file is streamed line by line; each line's hash format and role are
+    validated, usernames already in the database (fetched with one query) or
+    earlier in the file are skipped, and the rest are inserted with
+    executemany in batches inside a single transaction.
+
+    Args:
+        filepath: Path to the users file
+        batch_size: Rows per executemany call
+
+    Returns:
+        dict: inserted, skipped and invalid line counts
+    """
+    report = {"inserted": 0, "skipped": 0, "invalid": 0}
+    path = Path(filepath)
+    if not path.exists():
+        print(f"Warning: {filepath} not found. Skipping migration.")
+        return report
+
+    with pooled_connection() as conn:
+        seen = get_all_usernames(conn)
+        batch = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                parsed = parse_user_line(line)
+                if parsed is None:
+                    continue
+                if parsed == "invalid":
+                    report["invalid"] += 1
+                    continue
+                if parsed[0] in seen:
+                    report["skipped"] += 1
+                    continue
+                seen.add(parsed[0])
+                batch.append(parsed)
+                if len(batch) >= batch_size:
+                    insert_users(conn, batch)
+                    report["inserted"] += len(batch)
+                    batch = []
+        if batch:
+            insert_users(conn, batch)
+            report["inserted"] += len(batch)
+        # pooled_connection commits everything at once here
+
+    print(f" Imported {report['inserted']} users "
+          f"({report['skipped']} already existed, {report['invalid']} invalid lines)")
+    return report
+
+
 def migrate_users_from_file(filepath="users.txt"):
     """
     Migrate users from users.txt to the database.
@@ -37,46 +114,4 @@ def migrate_users_from_file(filepath="users.txt"):
     Returns:
         int: Number of users migrated
     """
-    conn = connect_database()
-    path = Path(filepath)
-    
-    # Check if file exists
-    if not path.exists():
-        print(f"Warning: {filepath} not found. Skipping migration.")
-        return 0
-    
-    cursor = conn.cursor()
-    migrated_count = 0
-    
-    # Read the file line by line
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            
-            # Skip empty lines and comments
-            if not line or line.startswith("#"):
-                continue
-            
-            # Parse the line
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) < 2:
-                continue
-            
-            username = parts[0]
-            password_hash = parts[1]
-            role = parts[2] if len(parts) >= 3 else "user"
-            
-            # Insert into database using parameterized query
-            try:
-                cursor.execute(
-                    "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                    (username, password_hash, role)
-                )
-                migrated_count += 1
-            except sqlite3.IntegrityError:
-                # User already exists (username is UNIQUE)
-                print(f" User '{username}' already exists. Skipping.")
-    
-    conn.commit()
-    conn.close()
-    return migrated_count
\ No newline at end of file
+    return import_users_from_file(filepath)["inserted"]
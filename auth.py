@@ -41,47 +41,90 @@ is_invalid = verify_password("WrongPassword", hashed)
 print(f"Verification with incorrect password: {is_invalid}")
 
 
+class UserStore:
+    """
+    users.txt loaded once into a dict keyed by username.
+
+    The file is re-read only when its mtime or size changes (e.g. edited by
+    another process), and registrations append through the store, so
+    lookups are O(1) and never rescan the file.
+    """
+
+    def __init__(self, path=USER_DATA_FILE):
+        self.path = path
+        self._users = {}
+        self._signature = None
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        users = {}
+        if signature is not None:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    parts = line.strip().split(',')
+                    if len(parts) < 2:
+                        continue
+                    # The first registration of a name wins, as in the old scan
+                    users.setdefault(parts[0], parts[1])
+        self._users = users
+        self._signature = signature
+
+    def __contains__(self, username):
+        self._refresh()
+        return username in self._users
+
+    def get_hash(self, username):
+        """Stored password hash for a user, or None if not registered."""
+        self._refresh()
+        return self._users.get(username)
+
+    def add(self, username, hashed_password):
+        """Append a user to the file and the in-memory index."""
+        self._refresh()
+        with open(self.path, 'a') as f:
+            f.write(f"{username},{hashed_password}\n")
+        self._users.setdefault(username, hashed_password)
+        # Our own append shouldn't trigger a reload
+        self._signature = self._file_signature()
+
+user_store = UserStore()
+
 def register_user(username, password):
    
-    # TODO: Check if the username already exists  
-    # TODO: Hash the password
-    # TODO: Append the new user to the file
-    # Format: username,hashed_password
+    # Check if the username already exists
+    if username in user_store:
+        print(f"Username {username} already exists.")
+        return False
 
+    # Hash the password and append the new user (format: username,hashed_password)
     hashed_password = hash_password(password)
-    with open(USER_DATA_FILE, 'a') as f:
-        f.write(f"{username},{hashed_password}\n")
-        print(f"User {username} registered.")
+    user_store.add(username, hashed_password)
+    print(f"User {username} registered.")
     return True
 
 def user_exists(username):
- # TODO: Handle the case where the file doesn't exist yet
- # TODO: Read the file and check each line for the username
-    with open(USER_DATA_FILE, 'r') as f:
-        for line in f:
-            stored_username, _ = line.strip().split(',', 1)
-            if stored_username == username:
-                return True
-    return False
+    return username in user_store
 
 def login_user(username, password):
-     # TODO: Handle the case where no users are registered yet
- # TODO: Search for the username in the file
- # TODO: If username matches, verify the password
- # TODO: If we reach here, the username was not found
-    if user_exists(username) == False:
+    stored_hashed_password = user_store.get_hash(username)
+    if stored_hashed_password is None:
         print("Username not found.")
         return False
-    with open(USER_DATA_FILE, 'r') as f:
-        for line in f:
-            stored_username, stored_hashed_password = line.strip().split(',', 1)
-            if stored_username == username:
-                if verify_password(password, stored_hashed_password):
-                    print(f"User {username} logged in.")
-                    return True
-                else:
-                    print("Incorrect password.")
-                    return False
+    if verify_password(password, stored_hashed_password):
+        print(f"User {username} logged in.")
+        return True
+    else:
+        print("Incorrect password.")
+        return False
                 
 def validate_username(username):
      #Returns: tuple: (bool, str) - (is_valid, error_message)
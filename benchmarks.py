@@ -0,0 +1,270 @@
+"""
+Performance benchmarks for the platform.
+
+Run from the project root:
+    python benchmarks.py
+"""
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+import bcrypt
+from app.services.password_hashing import PasswordHasher
+from app.services.login_throttle import LoginThrottle
+from app.data.schema import create_login_throttle_table
+from app.services.downsample import downsample_frame, LTTB, MINMAX
+from app.data.db import connect_database
+from app.data.loader import load_csv_files_parallel
+from app.data.migrations import migrate
+
+BENCH_PASSWORD = "SecurePass123!"
+
+
+def benchmark_logins(worker_counts=(1, 2, 4, 8), sessions=16, logins_per_session=4, rounds=10):
+    """
+    Measure login throughput of the hashing pool for different worker counts.
+
+    Each simulated session is a thread doing back-to-back password checks,
+    like a Streamlit script thread handling a login form.
+
+    Args:
+        worker_counts: Pool sizes to compare
+        sessions: Concurrent sessions logging in
+        logins_per_session: Password checks per session
+        rounds: bcrypt cost of the test hash
+
+    Returns:
+        list: One dict per worker count with logins_per_sec and the pool's
+            queue-wait metrics
+    """
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    total = sessions * logins_per_session
+
+    print("\n" + "=" * 60)
+    print(f"LOGIN THROUGHPUT ({total} logins, {sessions} sessions, cost {rounds})")
+    print("=" * 60)
+    print(f"{'Workers':<10}{'Logins/sec':<14}{'Queue avg ms':<16}{'Queue p95 ms':<16}")
+    print("-" * 56)
+
+    results = []
+    for workers in worker_counts:
+        hasher = PasswordHasher(max_workers=workers, max_queued=sessions, admit_timeout=None)
+
+        def session():
+            for _ in range(logins_per_session):
+                assert hasher.check_password(BENCH_PASSWORD, password_hash)
+
+        threads = [threading.Thread(target=session) for _ in range(sessions)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        hasher.shutdown()
+
+        stats = hasher.stats()
+        result = {"workers": workers, "logins_per_sec": total / elapsed, **stats}
+        results.append(result)
+        print(f"{workers:<10}{result['logins_per_sec']:<14.1f}"
+              f"{stats['queue_wait_avg_ms']:<16.1f}{stats['queue_wait_p95_ms']:<16.1f}")
+    return results
+
+
+def _run_login_storm(throttle, hasher, users, duration, attackers, legit_interval, attack_interval):
+    """One scenario of benchmark_login_throttle; returns legit latencies and attack counts."""
+    stop = threading.Event()
+    legit_latencies = []
+    attack_counts = {"attempts": 0, "rejected": 0}
+    counts_lock = threading.Lock()
+
+    def attempt(username, password, client_id):
+        if throttle is not None and not throttle.allow(username, client_id)[0]:
+            return None
+        stored = users.get(username)
+        return stored is not None and hasher.check_password(password, stored)
+
+    def legit_user():
+        while not stop.is_set():
+            started = time.perf_counter()
+            assert attempt("analyst", BENCH_PASSWORD, "10.0.0.1")
+            legit_latencies.append((time.perf_counter() - started) * 1000)
+            if throttle is not None:
+                throttle.record_success("analyst", "10.0.0.1")
+            stop.wait(legit_interval)
+
+    def attacker(n):
+        targets = [u for u in users if u != "analyst"]
+        i = 0
+        while not stop.is_set():
+            result = attempt(targets[i % len(targets)], f"guess{i}", f"203.0.113.{n}")
+            with counts_lock:
+                attack_counts["attempts"] += 1
+                attack_counts["rejected"] += result is None
+            i += 1
+            # Each try is a separate request; don't let the bench spin on the GIL
+            stop.wait(attack_interval)
+
+    threads = [threading.Thread(target=legit_user)]
+    threads += [threading.Thread(target=attacker, args=(n,)) for n in range(attackers)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return legit_latencies, attack_counts
+
+
+def benchmark_login_throttle(duration=5, attackers=8, accounts=50, rounds=10,
+                             legit_interval=0.25, attack_interval=0.01):
+    """
+    Load test: legitimate login latency while a credential-stuffing attack runs.
+
+    Runs the same storm with and without the LoginThrottle. Attackers cycle
+    through `accounts` real usernames with wrong passwords from a handful of
+    addresses, one request every attack_interval seconds each; one
+    legitimate user logs in every legit_interval seconds.
+
+    Returns:
+        dict: Per scenario, legit p50/p95 latency (ms), attack attempts and
+            how many were rejected before any bcrypt work
+    """
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    users = {f"user{i}": password_hash for i in range(accounts)}
+    users["analyst"] = password_hash
+
+    print("\n" + "=" * 60)
+    print(f"LOGIN LATENCY UNDER ATTACK ({attackers} attackers, {duration}s, cost {rounds})")
+    print("=" * 60)
+    print(f"{'Scenario':<14}{'Legit p50 ms':<15}{'Legit p95 ms':<15}{'Attempts':<11}{'Rejected':<10}")
+    print("-" * 65)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "throttle.db"
+        conn = sqlite3.connect(db_path)
+        create_login_throttle_table(conn)
+        conn.close()
+
+        for name in ("baseline", "unthrottled", "throttled"):
+            hasher = PasswordHasher(admit_timeout=None)
+            throttle = LoginThrottle(db_path) if name == "throttled" else None
+            storm = 0 if name == "baseline" else attackers
+            latencies, counts = _run_login_storm(throttle, hasher, users, duration, storm,
+                                                 legit_interval, attack_interval)
+            hasher.shutdown()
+
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            results[name] = {
+                "legit_p50_ms": statistics.median(latencies),
+                "legit_p95_ms": p95,
+                **counts,
+            }
+            print(f"{name:<14}{results[name]['legit_p50_ms']:<15.1f}{p95:<15.1f}"
+                  f"{counts['attempts']:<11}{counts['rejected']:<10}")
+    return results
+
+
+def benchmark_downsampling(years=(1, 5, 20), columns=4, max_points=500, repeats=5):
+    """
+    Chart payload and downsampling time for hourly series of growing length.
+
+    Args:
+        years: History lengths to test
+        columns: Lines per chart (e.g. one per priority)
+        max_points: Point budget passed to downsample_frame
+        repeats: Timing repetitions (best is reported)
+
+    Returns:
+        list: One dict per (years, mode) with rows in and out and best ms
+    """
+    import numpy as np
+    import pandas as pd
+
+    print("\n" + "=" * 60)
+    print(f"CHART DOWNSAMPLING (hourly, {columns} lines, budget {max_points})")
+    print("=" * 60)
+    print(f"{'Years':<8}{'Mode':<9}{'Rows in':<12}{'Rows out':<10}{'Best ms':<10}")
+    print("-" * 49)
+
+    rng = np.random.default_rng(0)
+    results = []
+    for span in years:
+        index = pd.date_range("2000-01-01", periods=span * 365 * 24, freq="h")
+        frame = pd.DataFrame(rng.poisson(3, size=(len(index), columns)), index=index,
+                             columns=[f"series{i}" for i in range(columns)])
+        for mode in (LTTB, MINMAX):
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                reduced = downsample_frame(frame, max_points, mode)
+                timings.append(time.perf_counter() - started)
+            result = {"years": span, "mode": mode, "rows_in": len(frame),
+                      "rows_out": len(reduced), "best_ms": min(timings) * 1000}
+            results.append(result)
+            print(f"{span:<8}{mode:<9}{len(frame):<12,}{len(reduced):<10}{result['best_ms']:<10.1f}")
+    return results
+
+
+def check_parallel_load_rollback(chunksize=10):
+    """
+    A parallel CSV load with one unparseable file must leave the database untouched.
+
+    Loads a valid incidents file next to a tickets file that ends in an
+    unterminated quote into a scratch database. The parse error must
+    surface, and no rows or ingest ledger entries may be committed for
+    either file.
+
+    Args:
+        chunksize: Rows per batch, small so batches are queued before the failure
+
+    Returns:
+        dict: Row counts per table before and after the failed load
+    """
+    print("\n" + "=" * 60)
+    print("PARALLEL LOAD ROLLBACK CHECK")
+    print("=" * 60)
+
+    tables = ("cyber_incidents", "it_tickets", "ingest_ledger")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        incidents_csv = tmp / "cyber_incidents.csv"
+        incidents_csv.write_text(Path("DATA/cyber_incidents.csv").read_text())
+        tickets_csv = tmp / "it_tickets.csv"
+        tickets_csv.write_text(Path("DATA/it_tickets.csv").read_text()
+                               + '9999,High,"Unterminated description,Open,IT_Support_A,'
+                                 '2024-01-01 00:00:00,1\n')
+
+        conn = connect_database(tmp / "check.db")
+        try:
+            migrate(conn)
+
+            def count():
+                return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables}
+
+            before = count()
+            try:
+                load_csv_files_parallel(conn, [(incidents_csv, "cyber_incidents"),
+                                               (tickets_csv, "it_tickets")], chunksize=chunksize)
+            except Exception as e:
+                print(f"Load failed as expected: {type(e).__name__}")
+            else:
+                raise AssertionError("Parallel load of a broken CSV did not fail")
+            after = count()
+        finally:
+            conn.close()
+
+    for table in tables:
+        print(f"{table:<18}{before[table]:>6} -> {after[table]}")
+    assert before == after, "Failed parallel load committed rows"
+    return {"before": before, "after": after}
+
+
+if __name__ == "__main__":
+    benchmark_logins()
+    benchmark_login_throttle()
+    benchmark_downsampling()
+    check_parallel_load_rollback()
@@ -6,17 +6,14 @@ st.set_page_config(
     layout="wide"
 )
 
-from app.auth import initialize_session_state
+from app.auth import require_login, logout
+from app.services.metrics import get_security_metrics, format_kpi
+from app.data.db import read_snapshot
+from app.data.rollups import DAY
+from app.services.downsample import get_incident_trend_downsampled
 
-# Initialize session
-initialize_session_state()
-
-# Authentication check
-if not st.session_state.logged_in:
-    st.error("🚫 You must be logged in to view this page")
-    if st.button("Go to Login"):
-        st.switch_page("Home.py")
-    st.stop()
+# Authentication check (signed session token, verified in memory)
+require_login()
 
 # Dashboard content (only shown if logged in)
 st.title("Dashboard")
@@ -42,33 +39,32 @@ with col3:
     if st.button("View IT Dashboard"):
         st.switch_page("pages/4_IT_Operations.py")
 
-st.header("Security Metrics")
-col1, col2, col3 = st.columns(3)
+# Every query below reads one consistent snapshot over a single connection
+with read_snapshot():
+    st.header("Security Metrics")
 
-with col1:
-    st.metric("Threats Detected", 247, delta="+12")
+    # Whole KPI set from one cached snapshot of cyber_incidents
+    security = get_security_metrics()
+    st.caption(f"Last {security['period_days']} days to {security['as_of']:%Y-%m-%d}, vs the {security['period_days']} days before")
+    col1, col2, col3 = st.columns(3)
 
-with col2:
-    st.metric("Vulnerabilities", 8, delta="-3")
+    with col1:
+        st.metric("Threats Detected", *format_kpi(security["incidents"]), delta_color="inverse")
 
-with col3:
-    st.metric("Incidents", 3, delta="+1")
+    with col2:
+        st.metric("High/Critical", *format_kpi(security["high_severity"]), delta_color="inverse")
 
+    with col3:
+        st.metric("Open Incidents", *format_kpi(security["open_incidents"]))
 
-st.header("Incident Trends")
 
-# Sample data for chart
-import pandas as pd
-import numpy as np
+    st.header("Incident Trends")
 
-# Create sample data
-data = pd.DataFrame(
-    np.random.randn(20, 3),
-    columns=['Malware', 'Phishing', 'DDoS']
-)
+    # Daily incidents per category from the rollup tables, downsampled for the chart
+    data = get_incident_trend_downsampled(bucket=DAY, by="category")
 
-# Line chart 
-st.line_chart(data)
+    # Line chart 
+    st.line_chart(data)
 
 # Sidebar with logout
 with st.sidebar:
@@ -78,11 +74,8 @@ with st.sidebar:
     
     # Logout button 
     if st.button("Log out"):
-        # Reset session state 
-        st.session_state.logged_in = False
-        st.session_state.username = ""
-        st.session_state.role = ""
-        st.write("You have been logged out")
+        # Revoke the session token and reset session state
+        logout()
         st.switch_page("Home.py")
 
 # AI Assistant Integration (Week 10)
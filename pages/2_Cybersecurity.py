@@ -1,6 +1,4 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 
 # Page configuration
 st.set_page_config(
@@ -8,142 +6,244 @@ st.set_page_config(
     layout="wide"
 )
 
-from app.auth import initialize_session_state
+from app.auth import require_login
+from app.data.db import read_snapshot
+from app.data.incidents import get_incidents_page, query_incidents
+from app.data.pagination import estimate_row_count
+from app.data.rollups import get_incident_trend, add_to_trend, DAY
+from app.data.changes import changes_since, latest_seq, apply_changes
+from app.services.table_window import paginated_window
+from app.services.metrics import get_security_metrics, format_kpi
+from app.services.incident_buffer import session_incident_buffer, FLUSH_INTERVAL_SECONDS
+from app.services.downsample import get_incident_trend_downsampled, downsample_frame
 
-# Initialize session
-initialize_session_state()
-
-# Authentication check
-if not st.session_state.logged_in:
-    st.error("🚫 You must be logged in to view this page")
-    if st.button("Go to Login"):
-        st.switch_page("Home.py")
-    st.stop()
+# Authentication check (signed session token, verified in memory)
+require_login()
 # Title
 st.title("🔒 Cybersecurity Dashboard")
 
-# Security metrics from PDF page 20
-st.header("Security Metrics")
-col1, col2, col3 = st.columns(3)
+LIVE_REFRESH_SECONDS = 5
+LIVE_ROWS = 10
+# Points sent to the browser per chart, whatever the date range
+CHART_POINTS = 500
+STATUSES = ["Open", "In Progress", "Investigating", "Resolved", "Closed"]
+
+# This session's pending incident edits (see app.services.incident_buffer)
+buffer = session_incident_buffer()
+
+
+def flush_buffer(force=False):
+    """Write the session's pending edits if due (or now, with force)."""
+    try:
+        return buffer.flush() if force else buffer.maybe_flush()
+    except Exception as e:
+        st.error(f"Could not save incidents, will retry: {e}")
+
+
+@st.fragment(run_every=FLUSH_INTERVAL_SECONDS)
+def pending_changes():
+    """Flush the buffer in the background and show what is still unsaved."""
+    flush_buffer()
+    pending = len(buffer)
+    if pending:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.caption(f"{pending} unsaved change(s) - saved automatically within {FLUSH_INTERVAL_SECONDS}s")
+        with col2:
+            if st.button("Save now"):
+                flush_buffer(force=True)
+                st.rerun()
+
 
-with col1:
-    st.metric("Threats Detected", 247, delta="+12")
+def load_incident_feed():
+    """Read the live section's frames and the feed position they match."""
+    with read_snapshot():
+        return {
+            "seq": latest_seq(),
+            "latest": query_incidents().order_by("id", descending=True).limit(LIVE_ROWS).fetch(),
+            "trend": get_incident_trend(bucket=DAY),
+            "chart": get_incident_trend_downsampled(bucket=DAY, max_points=CHART_POINTS),
+        }
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def incident_feed():
+    """
+    Trend chart and newest incidents, kept current from the change feed.
+
+    Each poll reads only the rows changed since the last one and patches
+    the frames held in session state; nothing is reloaded unless the feed
+    can't be applied (too far behind, or rows left the window).
+    """
+    feed = st.session_state.get("incident_feed")
+    if feed is None:
+        feed = load_incident_feed()
+    else:
+        delta = changes_since(feed["seq"], tables=("cyber_incidents",))
+        changes = delta["tables"]["cyber_incidents"]
+        if delta["reset"] or delta["more"]:
+            feed = load_incident_feed()
+        elif len(changes["upserts"]) or changes["deletes"]:
+            feed["seq"] = delta["seq"]
+            feed["latest"] = apply_changes(feed["latest"], changes, max_rows=LIVE_ROWS)
+            if len(feed["latest"]) < LIVE_ROWS and changes["deletes"]:
+                feed["latest"] = query_incidents().order_by("id", descending=True).limit(LIVE_ROWS).fetch()
+            if changes["counts"]["U"] or changes["counts"]["D"]:
+                # Old buckets of moved/deleted rows are unknown - re-read the rollups
+                feed["trend"] = get_incident_trend(bucket=DAY)
+                feed["chart"] = get_incident_trend_downsampled(bucket=DAY, max_points=CHART_POINTS)
+            else:
+                inserted = changes["upserts"][changes["upserts"]["id"].isin(changes["inserted"])]
+                feed["trend"] = add_to_trend(feed["trend"], inserted["timestamp"], DAY)
+                feed["chart"] = downsample_frame(feed["trend"], CHART_POINTS)
+        else:
+            feed["seq"] = delta["seq"]
+    st.session_state.incident_feed = feed
+
+    # Line chart, downsampled to CHART_POINTS
+    trend_data = feed["chart"].rename(columns={"count": "Incidents"}).rename_axis("Date")
+    st.line_chart(trend_data)
 
-with col2:
-    st.metric("Vulnerabilities", 8, delta="-3")
+    st.subheader("Latest Incidents")
+    st.caption(f"Live · change #{feed['seq']} · refreshes every {LIVE_REFRESH_SECONDS}s")
+    st.dataframe(feed["latest"], use_container_width=True)
 
-with col3:
-    st.metric("Incidents", 3, delta="+1")
+# Write due edits first, so the figures below include them
+flush_buffer()
 
-# Threat distribution 
-st.header("Threat Distribution")
+# Every query below reads one consistent snapshot over a single connection
+with read_snapshot():
+    st.header("Security Metrics")
 
-# Data 
-threat_data = pd.DataFrame({
-    "Threat Type": ["Malware", "Phishing", "DDoS", "Intrusion"],
-    "Count": [89, 67, 45, 46]
-})
+    # Whole KPI set from one cached snapshot of cyber_incidents
+    security = get_security_metrics()
+    st.caption(f"Last {security['period_days']} days to {security['as_of']:%Y-%m-%d}, vs the {security['period_days']} days before")
+    col1, col2, col3 = st.columns(3)
 
-# Bar chart 
-st.bar_chart(threat_data.set_index("Threat Type"))
+    with col1:
+        st.metric("Threats Detected", *format_kpi(security["incidents"]), delta_color="inverse")
 
-# Incident trends
-st.header("Incident Trends Over Time")
+    with col2:
+        st.metric("High/Critical", *format_kpi(security["high_severity"]), delta_color="inverse")
 
-# Create sample time series data
-dates = pd.date_range(start="2024-01-01", end="2024-11-01", freq="D")
-trend_data = pd.DataFrame({
-    "Date": dates,
-    "Incidents": np.random.randint(0, 10, size=len(dates))
-})
+    with col3:
+        st.metric("Open Incidents", *format_kpi(security["open_incidents"]))
 
-# Line chart 
-st.line_chart(trend_data.set_index("Date"))
+    # Threat distribution 
+    st.header("Threat Distribution")
+
+    # Incidents per category, from the same metrics snapshot
+    threat_data = security["by_category"].rename(columns={"count": "Count"}).rename_axis("Threat Type")
+
+    # Bar chart 
+    st.bar_chart(threat_data)
+
+    # Incident trends
+    st.header("Incident Trends Over Time")
+
+    # Daily incident counts from the rollups, patched live from the change feed
+    incident_feed()
 
 # CRUD Operations 
 st.header("Incident Management")
 
+# Changes are queued in the session buffer and written in batches
+pending_changes()
+
 # CREATE form 
 with st.form("add_incident"):
     st.subheader("Report New Incident")
-    
+
     incident_type = st.selectbox(
         "Incident Type",
         ["Malware", "Phishing", "DDoS", "Unauthorized Access", "Data Breach"]
     )
-    
+
     severity = st.selectbox(
         "Severity",
         ["Low", "Medium", "High", "Critical"]
     )
-    
+
     description = st.text_area("Description")
-    
+
     submitted = st.form_submit_button("Add Incident")
-    
+
     if submitted:
-        # Initialize records list if not present
-        if "incidents" not in st.session_state:
-            st.session_state.incidents = []
-        
-        # Add new record
-        record = {
-            "type": incident_type,
-            "severity": severity,
-            "description": description,
-            "status": "Open"
-        }
-        st.session_state.incidents.append(record)
+        # Shown straight away; written to the database with the next batch
+        buffer.add(incident_type, severity, description)
         st.success("Incident added!")
 
 # READ - Display incidents 
 st.header("All Incidents")
 
-if "incidents" in st.session_state and st.session_state.incidents:
-    # Convert to DataFrame 
-    df = pd.DataFrame(st.session_state.incidents)
-    
-    # Display interactive table 
-    st.dataframe(df, use_container_width=True)
-    
+# Only the visible page is read from the database
+incidents_page = paginated_window(
+    "incidents_window",
+    get_incidents_page,
+    total_estimate=estimate_row_count("cyber_incidents")
+)
+# Lay this session's unsaved changes over it (new incidents go on the first page)
+incidents_page = buffer.overlay(
+    incidents_page, include_new=st.session_state.incidents_window["page_no"] == 1
+)
+st.dataframe(incidents_page, use_container_width=True)
+
+if not incidents_page.empty:
+    # Labels leave out the status, which changes under the selection
+    labels = {
+        row.id: f"#{row.id}: {row.category}" if row.id > 0 else f"New: {row.category} (unsaved)"
+        for row in incidents_page.itertuples()
+    }
+
     # UPDATE - Modify incidents 
     st.subheader("Update Incident Status")
-    
-    # Get incident names for selection
-    incident_names = [f"Incident {i+1}: {inc['type']}" for i, inc in enumerate(st.session_state.incidents)]
-    
-    if incident_names:
-        selected = st.selectbox("Select incident to update", incident_names)
-        
-        # Find index
-        idx = incident_names.index(selected)
-        incident = st.session_state.incidents[idx]
-        
-        # Update form (PDF page 19)
-        with st.form("update_form"):
-            new_status = st.selectbox(
-                "New Status",
-                ["Open", "Investigating", "Resolved", "Closed"],
-                index=["Open", "Investigating", "Resolved", "Closed"].index(incident["status"])
-            )
-            
-            if st.form_submit_button("Update"):
-                st.session_state.incidents[idx]["status"] = new_status
+
+    # Keep the pick on the same incident after a flush gives it its stored id,
+    # and drop it if the incident is gone
+    chosen = st.session_state.get("selected_incident")
+    if chosen is not None:
+        chosen = buffer.resolve_id(chosen)
+        if chosen in labels:
+            st.session_state.selected_incident = chosen
+        else:
+            del st.session_state["selected_incident"]
+
+    selected = st.selectbox("Select incident to update", list(labels), format_func=labels.get,
+                            key="selected_incident")
+    incident = incidents_page[incidents_page["id"] == selected].iloc[0]
+
+    # Update form (PDF page 19)
+    with st.form("update_form"):
+        new_status = st.selectbox(
+            "New Status",
+            STATUSES,
+            index=STATUSES.index(incident["status"]) if incident["status"] in STATUSES else 0
+        )
+
+        if st.form_submit_button("Update"):
+            try:
+                buffer.update_status(selected, new_status)
+            except ValueError as e:
+                st.error(f"Could not update: {e}")
+            else:
                 st.success("Record updated!")
                 st.rerun()
-        
-        # DELETE - Remove incidents 
-        st.subheader("Delete Incident")
-        
-    
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.warning(f"Delete {selected}?")
-        
-        with col2:
-            if st.button("Delete", type="primary"):
-                st.session_state.incidents.pop(idx)
+
+    # DELETE - Remove incidents 
+    st.subheader("Delete Incident")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.warning(f"Delete {labels[selected]}?")
+
+    with col2:
+        if st.button("Delete", type="primary"):
+            try:
+                buffer.delete(selected)
+            except ValueError as e:
+                st.error(f"Could not delete: {e}")
+            else:
                 st.success("Record deleted!")
                 st.rerun()
 else:
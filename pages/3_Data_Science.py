@@ -1,6 +1,4 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 
 # Page configuration
 st.set_page_config(
@@ -8,76 +6,63 @@ st.set_page_config(
     layout="wide"
 )
 
-from app.auth import initialize_session_state
+from app.auth import require_login
+from app.services.metrics import get_data_science_metrics, format_kpi
 
-# Initialize session
-initialize_session_state()
-
-# Authentication check
-if not st.session_state.logged_in:
-    st.error("🚫 You must be logged in to view this page")
-    if st.button("Go to Login"):
-        st.switch_page("Home.py")
-    st.stop()
+# Authentication check (signed session token, verified in memory)
+require_login()
 
 # Title
 st.title("📈 Data Science Dashboard")
 
-# Model performance metrics
-st.header("Model Performance")
+# Whole KPI set from one cached snapshot of datasets_metadata
+metrics = get_data_science_metrics()
+
+# Dataset catalogue metrics
+st.header("Dataset Catalogue")
+st.caption(f"Deltas: added in the {metrics['period_days']} days to {metrics['as_of']:%Y-%m-%d}")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.metric("Accuracy", "94.2%")
+    st.metric("Datasets", *format_kpi(metrics["datasets"]))
 
 with col2:
-    st.metric("Precision", "91.8%")
+    st.metric("Total Records", *format_kpi(metrics["total_records"]))
 
 with col3:
-    st.metric("Recall", "89.5%")
-
-# Training history from PDF page 20
-st.header("Training History")
-
-# Create sample training data 
-history = pd.DataFrame({
-    "epoch": [1, 2, 3, 4, 5],
-    "loss": [0.45, 0.32, 0.24, 0.18, 0.15],
-    "accuracy": [0.78, 0.85, 0.89, 0.92, 0.94]
-})
+    st.metric("Total Size", *format_kpi(metrics["total_size_mb"], "{:,.1f}", " MB"))
 
-# Line chart with multiple lines 
-st.line_chart(history.set_index("epoch"))
+# Uploads per month
+st.header("Upload History")
+st.line_chart(metrics["uploads_by_month"]["uploads"])
 
 # Dataset statistics
 st.header("Dataset Statistics")
 
-# Sample dataset metrics
-datasets = pd.DataFrame({
-    "Dataset": ["Customer Data", "Sales Records", "Web Logs", "Sensor Data"],
-    "Size (GB)": [12.5, 8.3, 45.2, 120.7],
-    "Records": [50000, 120000, 1000000, 5000000],
-    "Features": [25, 15, 10, 8]
+datasets = metrics["datasets_table"].rename(columns={
+    "name": "Dataset", "category": "Category", "source": "Source", "rows": "Records",
+    "columns": "Features", "file_size_mb": "Size (MB)", "uploaded_by": "Uploaded By",
+    "upload_date": "Uploaded",
 })
 
 st.dataframe(datasets, use_container_width=True)
 
 # Bar chart for dataset sizes
 st.subheader("Dataset Sizes Comparison")
-st.bar_chart(datasets.set_index("Dataset")["Size (GB)"])
+st.bar_chart(datasets.set_index("Dataset")["Records"])
 
 # Data quality metrics
 st.header("Data Quality")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.metric("Completeness", "98.7%")
+    st.metric("Metadata Completeness", *format_kpi(metrics["completeness_pct"], "{:.1f}", "%"))
 
 with col2:
-    st.metric("Consistency", "96.2%")
+    st.metric("Avg Features", *format_kpi(metrics["avg_columns"], "{:.1f}"))
 
 with col3:
-    st.metric("Accuracy", "94.8%")
+    st.metric("Contributors", *format_kpi(metrics["uploaders"]))
 
 ("Sample correlation matrix")
 
@@ -1,7 +1,4 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
 
 # Page configuration
 st.set_page_config(
@@ -9,95 +6,87 @@ st.set_page_config(
     layout="wide"
 )
 
-from app.auth import initialize_session_state
-
-# Initialize session
-initialize_session_state()
-
-# Authentication check
-if not st.session_state.logged_in:
-    st.error("🚫 You must be logged in to view this page")
-    if st.button("Go to Login"):
-        st.switch_page("Home.py")
-    st.stop()
+from app.auth import require_login
+from app.data.db import read_snapshot
+from app.data.tickets import get_tickets_page
+from app.data.pagination import estimate_row_count
+from app.data.rollups import HOUR
+from app.services.table_window import paginated_window
+from app.services.metrics import get_it_metrics, format_kpi
+from app.services.downsample import get_ticket_trend_downsampled, MINMAX
+
+# Authentication check (signed session token, verified in memory)
+require_login()
 # Title
 st.title("🖥️ IT Operations Dashboard")
 
-# System health metrics 
-st.header("System Health")
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.metric("CPU Usage", "42%", delta="+3%")
-
-with col2:
-    st.metric("Memory", "63%", delta="-0.5%")
-
-with col3:
-    st.metric("Disk", "81%", delta="+1.5%")
-
-# Ticket management
-st.header("Ticket Management")
-
-# Sample ticket data
-tickets = pd.DataFrame({
-    "Ticket ID": [1001, 1002, 1003, 1004, 1005],
-    "Priority": ["High", "Medium", "Low", "High", "Medium"],
-    "Status": ["Open", "In Progress", "Resolved", "Open", "Closed"],
-    "Category": ["Hardware", "Software", "Network", "Software", "Hardware"],
-    "Created": ["2024-11-01", "2024-11-02", "2024-10-30", "2024-11-03", "2024-10-29"],
-    "Assignee": ["Alice", "Bob", "Charlie", "Alice", "Bob"]
-})
-
-# Display tickets
-st.dataframe(tickets, use_container_width=True)
-
-# Ticket statistics
-st.header("Ticket Statistics")
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    open_tickets = len(tickets[tickets["Status"] == "Open"])
-    st.metric("Open", open_tickets)
-
-with col2:
-    high_priority = len(tickets[tickets["Priority"] == "High"])
-    st.metric("High Priority", high_priority)
-
-with col3:
-    avg_resolution = "2.5 days"
-    st.metric("Avg Resolution", avg_resolution)
-
-with col4:
-    sla_compliance = "94%"
-    st.metric("SLA Compliance", sla_compliance)
-
-# Resource usage over time
-st.header("Resource Usage Over Time")
-
-# Create time series data
-dates = pd.date_range(start="2024-11-01", periods=24, freq="H")
-usage_data = pd.DataFrame({
-    "Time": dates,
-    "CPU": np.random.randint(30, 80, size=24),
-    "Memory": np.random.randint(50, 90, size=24),
-    "Network": np.random.randint(20, 70, size=24)
-})
-
-# Line chart for resource usage
-st.line_chart(usage_data.set_index("Time"))
-
-# Service status
-st.header("Service Status")
-
-services = pd.DataFrame({
-    "Service": ["Web Server", "Database", "API Gateway", "Cache", "Message Queue"],
-    "Status": ["✅ Healthy", "✅ Healthy", "⚠️ Degraded", "✅ Healthy", "✅ Healthy"],
-    "Uptime": ["99.9%", "99.95%", "99.8%", "99.99%", "99.9%"],
-    "Response Time": ["45ms", "120ms", "85ms", "12ms", "25ms"]
-})
-
-st.dataframe(services, use_container_width=True)
+# Every query below reads one consistent snapshot over a single connection
+with read_snapshot():
+    # Whole KPI set from one cached snapshot of it_tickets
+    metrics = get_it_metrics()
+
+    # Service desk health over the last period
+    st.header("Service Desk Health")
+    st.caption(f"Last {metrics['period_days']} days to {metrics['as_of']:%Y-%m-%d}, vs the {metrics['period_days']} days before")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Tickets Opened", *format_kpi(metrics["tickets_opened"]), delta_color="inverse")
+
+    with col2:
+        st.metric("Avg Resolution", *format_kpi(metrics["avg_resolution_hours"], "{:.1f}", " h"),
+                  delta_color="inverse")
+
+    with col3:
+        st.metric("SLA Compliance", *format_kpi(metrics["sla_compliance_pct"], "{:.0f}", "%"))
+
+    # Ticket management
+    st.header("Ticket Management")
+
+    # Ticket table - only the visible page is read from the database
+    tickets = paginated_window(
+        "tickets_window",
+        get_tickets_page,
+        total_estimate=estimate_row_count("it_tickets")
+    )
+
+    # Display tickets
+    st.dataframe(tickets, use_container_width=True)
+
+    # Ticket statistics
+    st.header("Ticket Statistics")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Open", *format_kpi(metrics["open_tickets"]))
+
+    with col2:
+        st.metric("High Priority Open", *format_kpi(metrics["open_high_priority"]))
+
+    with col3:
+        st.metric("Total Tickets", *format_kpi(metrics["total_tickets"]))
+
+    st.bar_chart(metrics["by_status"])
+
+    # Ticket volume over time
+    st.header("Ticket Volume Over Time")
+
+    # Hourly tickets per priority from the rollup tables. Min/max
+    # downsampling keeps every spike within the chart's point budget.
+    volume_data = get_ticket_trend_downsampled(bucket=HOUR, by="priority", mode=MINMAX)
+
+    # Line chart for ticket volume
+    st.line_chart(volume_data)
+
+    # Team workload
+    st.header("Team Workload")
+
+    workload = metrics["workload"].rename(columns={
+        "open": "Open", "resolved": "Resolved",
+        "avg_resolution_hours": "Avg Resolution (h)", "sla_pct": "SLA Compliance (%)",
+    }).rename_axis("Assignee").round(1)
+
+    st.dataframe(workload, use_container_width=True)
 
 # Navigation
 st.markdown("---")
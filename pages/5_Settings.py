@@ -6,17 +6,12 @@ st.set_page_config(
     layout="wide"
 )
 
-from app.auth import initialize_session_state
+from app.auth import require_login
+from app.data.incidents import query_incidents
+from app.services.incident_buffer import session_incident_buffer, clear_user_incidents
 
-# Initialize session
-initialize_session_state()
-
-# Authentication check
-if not st.session_state.logged_in:
-    st.error("🚫 You must be logged in to view this page")
-    if st.button("Go to Login"):
-        st.switch_page("Home.py")
-    st.stop()
+# Authentication check (signed session token, verified in memory)
+require_login()
 # Title
 st.title("⚙️ Settings")
 
@@ -79,9 +74,22 @@ with st.expander("Advanced Options"):
     
     with col1:
         if st.button("Clear All Data", type="secondary"):
-            if "incidents" in st.session_state:
-                st.session_state.incidents = []
-            st.success("Data cleared!")
+            st.session_state.confirm_clear_data = True
+
+        # Deleting stored incidents can't be undone, so ask once more with the count
+        if st.session_state.get("confirm_clear_data"):
+            buffer = session_incident_buffer()
+            stored = query_incidents().where(reported_by=st.session_state.username).count()
+            st.error(f"This permanently deletes {stored} incidents you reported"
+                     f" and discards {len(buffer)} unsaved changes.")
+            if st.button(f"Yes, delete {stored} incidents", type="primary"):
+                # Drop unsaved edits and delete the incidents this user reported
+                deleted = clear_user_incidents(st.session_state.username, buffer)
+                st.session_state.confirm_clear_data = False
+                st.success(f"Data cleared! ({deleted} incidents deleted)")
+            if st.button("Cancel"):
+                st.session_state.confirm_clear_data = False
+                st.rerun()
     
     with col2:
         if st.button("Reset to Defaults", type="secondary"):
@@ -9,17 +9,10 @@ st.set_page_config(
     layout="wide"
 )
 
-from app.auth import initialize_session_state
+from app.auth import require_login
 
-# Initialize session
-initialize_session_state()
-
-# Authentication check
-if not st.session_state.logged_in:
-    st.error("🚫 You must be logged in to view this page")
-    if st.button("Go to Login"):
-        st.switch_page("Home.py")
-    st.stop()
+# Authentication check (signed session token, verified in memory)
+require_login()
 # Initialize OpenAI client
 try:
     # Try environment variable first, then Streamlit secrets, then .env file